@@ -7,7 +7,7 @@ config = context.config
 
 # Import models for Alembic autogenerate support
 from app.database import Base
-from app.models import doctor, patient, availability, appointment
+from app.models import doctor, patient, availability, appointment, account
 
 # Set the url in alembic.ini with the one from settings
 from app.config import settings
@@ -19,12 +19,19 @@ fileConfig(config.config_file_name)
 # Add model's MetaData object here
 target_metadata = Base.metadata
 
+def include_object(object, name, type_, reflected, compare_to):
+    # The doctor search index (and its FTS5 shadow tables) is managed by hand
+    if type_ == "table" and reflected and compare_to is None and name.startswith("doctor_search"):
+        return False
+    return True
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode."""
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -43,7 +50,8 @@ def run_migrations_online() -> None:
     with connectable.connect() as connection:
         context.configure(
             connection=connection, 
-            target_metadata=target_metadata
+            target_metadata=target_metadata,
+            include_object=include_object
         )
 
         with context.begin_transaction():
@@ -0,0 +1,47 @@
+"""Add composite indexes for booking queries
+
+Revision ID: 3b9c2d4e7a10
+Revises: fee4a5111169
+Create Date: 2026-10-18 09:12:41.128305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9c2d4e7a10'
+down_revision: Union[str, None] = 'fee4a5111169'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_availabilities_doctor_day_active_time',
+        'availabilities',
+        ['doctor_id', 'day_of_week', 'is_active', 'start_time', 'end_time'],
+        unique=False
+    )
+    op.create_index(
+        'ix_appointments_doctor_datetime_status',
+        'appointments',
+        ['doctor_id', 'appointment_datetime', 'status'],
+        unique=False
+    )
+    op.create_index(
+        'ix_appointments_patient_datetime',
+        'appointments',
+        ['patient_id', 'appointment_datetime'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_appointments_patient_datetime', table_name='appointments')
+    op.drop_index('ix_appointments_doctor_datetime_status', table_name='appointments')
+    op.drop_index('ix_availabilities_doctor_day_active_time', table_name='availabilities')
@@ -0,0 +1,29 @@
+"""Add doctor schedule version
+
+Revision ID: 4c8e2b6d1f05
+Revises: e6b4f1a9c372
+Create Date: 2026-10-18 21:12:09.481736
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c8e2b6d1f05'
+down_revision: Union[str, None] = 'e6b4f1a9c372'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('doctors', sa.Column('schedule_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('doctors') as batch_op:
+        batch_op.drop_column('schedule_version')
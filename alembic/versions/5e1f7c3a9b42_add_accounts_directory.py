@@ -0,0 +1,64 @@
+"""Add accounts directory for login lookups
+
+Revision ID: 5e1f7c3a9b42
+Revises: 3b9c2d4e7a10
+Create Date: 2026-10-18 11:03:17.552016
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e1f7c3a9b42'
+down_revision: Union[str, None] = '3b9c2d4e7a10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Login used to try doctors first and then patients, so an email registered
+    # under both roles could sign in as either. The accounts directory allows
+    # one role per email; stop before any change rather than lock one of them out.
+    shared = op.get_bind().execute(sa.text(
+        "SELECT email FROM doctors WHERE email IN (SELECT email FROM patients) ORDER BY email"
+    )).scalars().all()
+    if shared:
+        raise RuntimeError(
+            f"{len(shared)} email(s) are registered as both a doctor and a patient: {', '.join(shared)}. "
+            "Each email can only belong to one account; change the email of one of the two records "
+            "and run the migration again."
+        )
+
+    op.create_table('accounts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(length=100), nullable=False),
+    sa.Column('role', sa.String(length=10), nullable=False),
+    sa.Column('principal_id', sa.Integer(), nullable=False),
+    sa.Column('hashed_password', sa.String(length=100), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('role', 'principal_id', name='uq_accounts_role_principal')
+    )
+    op.create_index(op.f('ix_accounts_email'), 'accounts', ['email'], unique=True)
+    op.create_index(op.f('ix_accounts_id'), 'accounts', ['id'], unique=False)
+
+    # Backfill from existing doctors and patients
+    op.execute(
+        "INSERT INTO accounts (email, role, principal_id, hashed_password, is_active) "
+        "SELECT email, 'doctor', id, hashed_password, is_active FROM doctors"
+    )
+    op.execute(
+        "INSERT INTO accounts (email, role, principal_id, hashed_password, is_active) "
+        "SELECT email, 'patient', id, hashed_password, is_active FROM patients"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_accounts_id'), table_name='accounts')
+    op.drop_index(op.f('ix_accounts_email'), table_name='accounts')
+    op.drop_table('accounts')
@@ -0,0 +1,30 @@
+"""Add doctor directory indexes
+
+Revision ID: 7a2e9f0c5d13
+Revises: 5e1f7c3a9b42
+Create Date: 2026-10-18 12:26:54.901337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a2e9f0c5d13'
+down_revision: Union[str, None] = '5e1f7c3a9b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_doctors_specialization_id', 'doctors', ['specialization', 'id'], unique=False)
+    op.create_index('ix_doctors_is_active_id', 'doctors', ['is_active', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_doctors_is_active_id', table_name='doctors')
+    op.drop_index('ix_doctors_specialization_id', table_name='doctors')
@@ -0,0 +1,41 @@
+"""Narrow the availability index to doctor and active flag
+
+Revision ID: 8d3f5a7c2e91
+Revises: 4c8e2b6d1f05
+Create Date: 2026-10-18 21:48:55.062417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d3f5a7c2e91'
+down_revision: Union[str, None] = '4c8e2b6d1f05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Availabilities are only read per doctor now (the slot bitmaps), never by weekday or time
+    op.drop_index('ix_availabilities_doctor_day_active_time', table_name='availabilities')
+    op.create_index(
+        'ix_availabilities_doctor_active',
+        'availabilities',
+        ['doctor_id', 'is_active'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_availabilities_doctor_active', table_name='availabilities')
+    op.create_index(
+        'ix_availabilities_doctor_day_active_time',
+        'availabilities',
+        ['doctor_id', 'day_of_week', 'is_active', 'start_time', 'end_time'],
+        unique=False
+    )
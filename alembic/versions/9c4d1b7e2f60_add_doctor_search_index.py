@@ -0,0 +1,59 @@
+"""Add doctor search index
+
+Revision ID: 9c4d1b7e2f60
+Revises: 7a2e9f0c5d13
+Create Date: 2026-10-18 13:04:12.518274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4d1b7e2f60'
+down_revision: Union[str, None] = '7a2e9f0c5d13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS doctor_search USING fts5("
+            "full_name, specialization, hospitals, institutions, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        op.execute(
+            "INSERT INTO doctor_search (rowid, full_name, specialization, hospitals, institutions) "
+            "SELECT d.id, d.full_name, coalesce(d.specialization, ''), "
+            "coalesce((SELECT group_concat(w.hospital_name, ' ') FROM work_experience w WHERE w.doctor_id = d.id), ''), "
+            "coalesce((SELECT group_concat(a.institution, ' ') FROM academic_history a WHERE a.doctor_id = d.id), '') "
+            "FROM doctors d"
+        )
+    elif dialect == 'postgresql':
+        op.execute(
+            "CREATE TABLE IF NOT EXISTS doctor_search ("
+            "doctor_id INTEGER PRIMARY KEY REFERENCES doctors(id) ON DELETE CASCADE, "
+            "document TSVECTOR NOT NULL)"
+        )
+        op.execute("CREATE INDEX IF NOT EXISTS ix_doctor_search_document ON doctor_search USING GIN (document)")
+        op.execute(
+            "INSERT INTO doctor_search (doctor_id, document) "
+            "SELECT d.id, "
+            "setweight(to_tsvector('simple', d.full_name), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(d.specialization, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce((SELECT string_agg(w.hospital_name, ' ') "
+            "FROM work_experience w WHERE w.doctor_id = d.id), '')), 'B') || "
+            "setweight(to_tsvector('simple', coalesce((SELECT string_agg(a.institution, ' ') "
+            "FROM academic_history a WHERE a.doctor_id = d.id), '')), 'C') "
+            "FROM doctors d"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name in ('sqlite', 'postgresql'):
+        op.execute("DROP TABLE IF EXISTS doctor_search")
@@ -0,0 +1,35 @@
+"""Add row versions
+
+Revision ID: b81f3e6a0d27
+Revises: 9c4d1b7e2f60
+Create Date: 2026-10-18 13:41:37.206519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b81f3e6a0d27'
+down_revision: Union[str, None] = '9c4d1b7e2f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('doctors', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('availabilities', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('appointments', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('appointments') as batch_op:
+        batch_op.drop_column('version')
+    with op.batch_alter_table('availabilities') as batch_op:
+        batch_op.drop_column('version')
+    with op.batch_alter_table('doctors') as batch_op:
+        batch_op.drop_column('version')
@@ -0,0 +1,97 @@
+"""Add appointment slot key
+
+Revision ID: d2a7c5e8f914
+Revises: b81f3e6a0d27
+Create Date: 2026-10-18 14:12:08.663140
+
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a7c5e8f914'
+down_revision: Union[str, None] = 'b81f3e6a0d27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SLOT_MINUTES = 30
+ACTIVE_STATUS_CLAUSE = "status IN ('pending', 'confirmed', 'rescheduled')"
+
+# appointment_datetime floored to the slot grid, per dialect. The SQLite form
+# matches the text SQLAlchemy stores for DateTime, so backfilled and new keys compare equal.
+SLOT_START_SQL = {
+    'sqlite': (
+        "strftime('%Y-%m-%d %H:', appointment_datetime) || "
+        f"printf('%02d', CAST(strftime('%M', appointment_datetime) AS INTEGER) / {SLOT_MINUTES} * {SLOT_MINUTES}) || "
+        "'\\:00.000000'"
+    ),
+    'postgresql': (
+        "date_trunc('hour', appointment_datetime) + "
+        f"CAST(floor(extract(minute FROM appointment_datetime) / {SLOT_MINUTES}) AS integer) * interval '{SLOT_MINUTES} minutes'"
+    ),
+}
+
+# Active appointments that share a doctor slot with an active appointment of a
+# lower id. Bookings used to be checked against [t, t + 30 min) and only for
+# pending/confirmed appointments, so e.g. 10:00 and 10:20 could both be booked.
+DUPLICATE_SLOT_CLAUSE = (
+    f"{ACTIVE_STATUS_CLAUSE} AND EXISTS ("
+    "SELECT 1 FROM appointments AS kept "
+    "WHERE kept.doctor_id = appointments.doctor_id "
+    "AND kept.slot_start = appointments.slot_start "
+    "AND kept.id < appointments.id "
+    "AND kept.status IN ('pending', 'confirmed', 'rescheduled'))"
+)
+DUPLICATE_NOTE = f"Cancelled by migration {revision}: another appointment holds this slot"
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('appointments', sa.Column('slot_start', sa.DateTime(), nullable=True))
+
+    connection = op.get_bind()
+    dialect = connection.dialect.name
+    if dialect not in SLOT_START_SQL:
+        raise NotImplementedError(f"No slot_start backfill for the {dialect} dialect")
+    op.execute(f"UPDATE appointments SET slot_start = {SLOT_START_SQL[dialect]}")
+
+    with op.batch_alter_table('appointments') as batch_op:
+        batch_op.alter_column('slot_start', existing_type=sa.DateTime(), nullable=False)
+
+    # Keep the earliest booking of each doctor slot and cancel the rest, so the
+    # unique index below can be built
+    duplicates = connection.execute(sa.text(
+        f"SELECT id, doctor_id, slot_start FROM appointments WHERE {DUPLICATE_SLOT_CLAUSE} ORDER BY id"
+    )).all()
+    if duplicates:
+        logger.warning(
+            "Cancelling %d appointment(s) that share a doctor slot with an earlier booking: %s",
+            len(duplicates),
+            ", ".join(f"id {row.id} (doctor {row.doctor_id}, {row.slot_start})" for row in duplicates)
+        )
+        op.execute(sa.text(
+            "UPDATE appointments SET status = 'cancelled', version = version + 1, "
+            "notes = COALESCE(notes || :separator, '') || :note "
+            f"WHERE {DUPLICATE_SLOT_CLAUSE}"
+        ).bindparams(separator="\n", note=DUPLICATE_NOTE))
+
+    op.create_index(
+        'uq_appointments_doctor_slot_active', 'appointments', ['doctor_id', 'slot_start'], unique=True,
+        sqlite_where=sa.text(ACTIVE_STATUS_CLAUSE), postgresql_where=sa.text(ACTIVE_STATUS_CLAUSE)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        'uq_appointments_doctor_slot_active', table_name='appointments',
+        sqlite_where=sa.text(ACTIVE_STATUS_CLAUSE), postgresql_where=sa.text(ACTIVE_STATUS_CLAUSE)
+    )
+    with op.batch_alter_table('appointments') as batch_op:
+        batch_op.drop_column('slot_start')
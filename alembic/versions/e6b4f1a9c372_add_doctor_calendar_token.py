@@ -0,0 +1,31 @@
+"""Add doctor calendar token
+
+Revision ID: e6b4f1a9c372
+Revises: d2a7c5e8f914
+Create Date: 2026-10-18 16:40:27.318254
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6b4f1a9c372'
+down_revision: Union[str, None] = 'd2a7c5e8f914'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('doctors', sa.Column('calendar_token', sa.String(length=64), nullable=True))
+    op.create_index('uq_doctors_calendar_token', 'doctors', ['calendar_token'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_doctors_calendar_token', table_name='doctors')
+    with op.batch_alter_table('doctors') as batch_op:
+        batch_op.drop_column('calendar_token')
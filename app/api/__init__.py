@@ -1,10 +1,16 @@
 from fastapi import APIRouter
 
-from app.api.endpoints import auth, doctors, patients, availability, appointments
+from app.config import settings
+
+if settings.ASYNC_DB_ENABLED:
+    from app.api.async_endpoints import auth, doctors, patients, availability, appointments, calendar
+else:
+    from app.api.endpoints import auth, doctors, patients, availability, appointments, calendar
 
 api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
 api_router.include_router(doctors.router, prefix="/doctors", tags=["doctors"])
 api_router.include_router(patients.router, prefix="/patients", tags=["patients"])
 api_router.include_router(availability.router, prefix="/availabilities", tags=["availabilities"])
-api_router.include_router(appointments.router, prefix="/appointments", tags=["appointments"])
\ No newline at end of file
+api_router.include_router(appointments.router, prefix="/appointments", tags=["appointments"])
+api_router.include_router(calendar.router, prefix="/calendar", tags=["calendar"])
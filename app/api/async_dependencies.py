@@ -0,0 +1,64 @@
+from fastapi import Depends, HTTPException, status
+from jose import JWTError
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Union
+
+from app.database import get_async_db
+from app.models.doctor import Doctor
+from app.models.patient import Patient
+from app.core.auth_cache import get_cached_principal, cache_principal
+from app.api.dependencies import oauth2_scheme, decode_token_subject
+
+async def get_current_user(
+    db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)
+) -> Union[Doctor, Patient]:
+    try:
+        user_id = decode_token_subject(token)
+        
+        cached_user = get_cached_principal(user_id)
+        if cached_user is not None:
+            # Attach a session-local copy without a round-trip
+            return await db.merge(cached_user, load=False)
+        
+        # Check if it's a doctor (first character: D) or patient (first character: P)
+        if user_id.startswith("D"):
+            user = await db.get(Doctor, int(user_id[1:]))
+            if not user:
+                raise HTTPException(status_code=404, detail="Doctor not found")
+            cache_principal(user)
+            return user
+        elif user_id.startswith("P"):
+            user = await db.get(Patient, int(user_id[1:]))
+            if not user:
+                raise HTTPException(status_code=404, detail="Patient not found")
+            cache_principal(user)
+            return user
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid user type",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+    except (JWTError, ValidationError):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+async def get_current_doctor(current_user: Union[Doctor, Patient] = Depends(get_current_user)) -> Doctor:
+    if not isinstance(current_user, Doctor):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Doctor access required",
+        )
+    return current_user
+
+async def get_current_patient(current_user: Union[Doctor, Patient] = Depends(get_current_user)) -> Patient:
+    if not isinstance(current_user, Patient):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Patient access required",
+        )
+    return current_user
@@ -0,0 +1,308 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import datetime
+
+from app.database import get_async_db
+from app.models.doctor import Doctor
+from app.models.patient import Patient
+from app.models.appointment import Appointment, AppointmentStatus, ACTIVE_STATUSES
+from app.models.availability import Availability
+from app.schemas.appointment import (
+    Appointment as AppointmentSchema,
+    AppointmentCreate,
+    AppointmentReschedule,
+    AppointmentBatchCreate,
+    AppointmentBatchItemResult,
+    AppointmentBatchResult
+)
+from app.core.booking import SLOT_TAKEN, insert_batch, validate_batch
+from app.core.slots import slot_start
+from app.core.schedule import current_schedule
+from app.core.etag import if_none_match, etag_matches, not_modified
+from app.core.export import EXPORT_FORMATS, ExportFormat, export_filename, stream_appointments_async
+from app.core.fast_json import FastJSONResponse, rows_to_dicts
+from app.api.async_dependencies import get_current_doctor, get_current_patient
+from app.api.endpoints.appointments import (
+    APPOINTMENT_ORDER,
+    APPOINTMENT_COLUMNS,
+    appointment_etag,
+    appointment_criteria,
+    set_appointment_cursor
+)
+
+router = APIRouter()
+
+async def check_availability(
+    db: AsyncSession,
+    doctor_id: int,
+    appointment_datetime: datetime
+):
+    # A bit test against the doctor's weekly slot bitmap, checked against the
+    # database's schedule_version so availability removed by another worker is
+    # honoured; slot conflicts are left to the unique slot index, see flush_booking
+    schedule = await db.run_sync(current_schedule, doctor_id)
+    return schedule.is_available(appointment_datetime)
+
+async def flush_booking(db: AsyncSession):
+    # Write the booking; a second active appointment in the same doctor slot
+    # violates uq_appointments_doctor_slot_active, even under concurrent requests
+    try:
+        await db.flush()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=SLOT_TAKEN
+        )
+
+@router.post("/", response_model=AppointmentSchema, status_code=status.HTTP_201_CREATED)
+async def create_appointment(
+    appointment_in: AppointmentCreate,
+    current_patient: Patient = Depends(get_current_patient),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Check if doctor exists
+    if not await db.get(Doctor, appointment_in.doctor_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Doctor not found"
+        )
+    
+    # Check doctor's availability
+    if not await check_availability(db, appointment_in.doctor_id, appointment_in.appointment_datetime):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Doctor is not available at this time"
+        )
+    
+    # Create new appointment
+    db_appointment = Appointment(
+        doctor_id=appointment_in.doctor_id,
+        patient_id=current_patient.id,
+        appointment_datetime=appointment_in.appointment_datetime,
+        reason=appointment_in.reason,
+        notes=appointment_in.notes,
+        status=AppointmentStatus.PENDING
+    )
+    db.add(db_appointment)
+    await flush_booking(db)
+    await db.commit()
+    await db.refresh(db_appointment)
+    return db_appointment
+
+@router.post("/batch", response_model=AppointmentBatchResult)
+async def create_appointments_batch(
+    batch_in: AppointmentBatchCreate,
+    current_patient: Patient = Depends(get_current_patient),
+    db: AsyncSession = Depends(get_async_db)
+):
+    items = batch_in.appointments
+    requested = [(item.doctor_id, item.appointment_datetime) for item in items]
+    
+    # Load everything the batch needs with one query per table
+    doctor_ids = set(await db.scalars(select(Doctor.id).where(
+        Doctor.id.in_({item.doctor_id for item in items})
+    )))
+    availabilities = (await db.scalars(select(Availability).where(
+        Availability.doctor_id.in_(doctor_ids),
+        Availability.is_active == True
+    ))).all()
+    slots = [slot_start(appointment_datetime) for _, appointment_datetime in requested]
+    booked = (await db.execute(select(Appointment.doctor_id, Appointment.slot_start).where(
+        Appointment.doctor_id.in_(doctor_ids),
+        Appointment.slot_start >= min(slots),
+        Appointment.slot_start <= max(slots),
+        Appointment.status.in_(ACTIVE_STATUSES)
+    ))).all()
+    
+    errors = validate_batch(requested, doctor_ids, availabilities, booked)
+    
+    created = await db.run_sync(insert_batch, current_patient.id, items, requested, errors)
+    
+    # Serialize before commit so the new rows don't have to be reloaded one by one
+    results = [
+        AppointmentBatchItemResult(
+            index=index,
+            success=error is None,
+            appointment=AppointmentSchema.model_validate(created[index]) if error is None else None,
+            error=error
+        )
+        for index, error in enumerate(errors)
+    ]
+    await db.commit()
+    return AppointmentBatchResult(
+        created=len(created), failed=len(items) - len(created), results=results
+    )
+
+async def list_appointments(db: AsyncSession, request: Request, limit: int, *criteria):
+    # Revalidate against row versions before loading and serializing full rows
+    header = if_none_match(request)
+    if header:
+        result = await db.execute(
+            select(Appointment.id, Appointment.version, Appointment.appointment_datetime)
+            .where(*criteria).order_by(*APPOINTMENT_ORDER).limit(limit + 1)
+        )
+        rows = result.all()
+        etag = appointment_etag(rows, limit)
+        if etag_matches(header, etag):
+            unchanged = not_modified(etag)
+            set_appointment_cursor(unchanged, rows, limit)
+            return unchanged
+    
+    result = await db.execute(
+        select(*APPOINTMENT_COLUMNS, Appointment.version)
+        .where(*criteria).order_by(*APPOINTMENT_ORDER).limit(limit + 1)
+    )
+    appointments = result.all()
+    page = FastJSONResponse(
+        rows_to_dicts(appointments[:limit], APPOINTMENT_COLUMNS),
+        headers={"ETag": appointment_etag(appointments, limit)}
+    )
+    set_appointment_cursor(page, appointments, limit)
+    return page
+
+@router.get("/doctor", response_model=List[AppointmentSchema])
+async def read_doctor_appointments(
+    request: Request,
+    start: Optional[datetime] = Query(None, alias="from", description="Defaults to now"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    statuses: Optional[List[AppointmentStatus]] = Query(None, alias="status"),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    current_doctor: Doctor = Depends(get_current_doctor),
+    db: AsyncSession = Depends(get_async_db)
+):
+    criteria = appointment_criteria(cursor, start, end, statuses)
+    return await list_appointments(
+        db, request, limit, Appointment.doctor_id == current_doctor.id, *criteria
+    )
+
+@router.get("/patient", response_model=List[AppointmentSchema])
+async def read_patient_appointments(
+    request: Request,
+    start: Optional[datetime] = Query(None, alias="from", description="Defaults to now"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    statuses: Optional[List[AppointmentStatus]] = Query(None, alias="status"),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    current_patient: Patient = Depends(get_current_patient),
+    db: AsyncSession = Depends(get_async_db)
+):
+    criteria = appointment_criteria(cursor, start, end, statuses)
+    return await list_appointments(
+        db, request, limit, Appointment.patient_id == current_patient.id, *criteria
+    )
+
+@router.get("/doctor/export")
+async def export_doctor_appointments(
+    request: Request,
+    format: ExportFormat = "ndjson",
+    current_doctor: Doctor = Depends(get_current_doctor)
+):
+    # Full history, written to the response as it is read
+    return StreamingResponse(
+        stream_appointments_async(
+            format, f"{request.method} {request.url.path}", Appointment.doctor_id == current_doctor.id
+        ),
+        media_type=EXPORT_FORMATS[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{export_filename("doctor", current_doctor.id, format)}"'
+        }
+    )
+
+@router.get("/patient/export")
+async def export_patient_appointments(
+    request: Request,
+    format: ExportFormat = "ndjson",
+    current_patient: Patient = Depends(get_current_patient)
+):
+    # Full history, written to the response as it is read
+    return StreamingResponse(
+        stream_appointments_async(
+            format, f"{request.method} {request.url.path}", Appointment.patient_id == current_patient.id
+        ),
+        media_type=EXPORT_FORMATS[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{export_filename("patient", current_patient.id, format)}"'
+        }
+    )
+
+@router.put("/{appointment_id}/cancel", response_model=AppointmentSchema)
+async def cancel_appointment(
+    appointment_id: int,
+    current_doctor: Doctor = Depends(get_current_doctor),
+    db: AsyncSession = Depends(get_async_db)
+):
+    result = await db.execute(select(Appointment).where(
+        Appointment.id == appointment_id,
+        Appointment.doctor_id == current_doctor.id
+    ))
+    db_appointment = result.scalars().first()
+    if not db_appointment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Appointment not found"
+        )
+    
+    if db_appointment.status == AppointmentStatus.CANCELLED:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Appointment is already cancelled"
+        )
+    
+    db_appointment.status = AppointmentStatus.CANCELLED
+    db.add(db_appointment)
+    await db.commit()
+    await db.refresh(db_appointment)
+    return db_appointment
+
+@router.put("/{appointment_id}/reschedule", response_model=AppointmentSchema)
+async def reschedule_appointment(
+    appointment_id: int,
+    reschedule_in: AppointmentReschedule,
+    current_patient: Patient = Depends(get_current_patient),
+    db: AsyncSession = Depends(get_async_db)
+):
+    result = await db.execute(select(Appointment).where(
+        Appointment.id == appointment_id,
+        Appointment.patient_id == current_patient.id
+    ))
+    db_appointment = result.scalars().first()
+    if not db_appointment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Appointment not found"
+        )
+    
+    if db_appointment.status == AppointmentStatus.CANCELLED:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot reschedule a cancelled appointment"
+        )
+    
+    if db_appointment.status == AppointmentStatus.COMPLETED:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot reschedule a completed appointment"
+        )
+    
+    # Check doctor's availability for the new time
+    if not await check_availability(db, db_appointment.doctor_id, reschedule_in.appointment_datetime):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Doctor is not available at this time"
+        )
+    
+    # The version check rejects a concurrent change to this appointment and the
+    # slot index a concurrent booking of the new slot; both surface as 409
+    db_appointment.appointment_datetime = reschedule_in.appointment_datetime
+    db_appointment.status = AppointmentStatus.RESCHEDULED
+    db.add(db_appointment)
+    await flush_booking(db)
+    await db.commit()
+    await db.refresh(db_appointment)
+    return db_appointment
@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import timedelta
+
+from app.database import get_async_db
+from app.models.account import Account
+from app.core.security import create_access_token
+from app.core.hashing import hashing_executor
+from app.config import settings
+
+router = APIRouter()
+
+@router.post("/login")
+async def login(
+    db: AsyncSession = Depends(get_async_db), form_data: OAuth2PasswordRequestForm = Depends()
+):
+    # Doctors and patients share one email directory
+    account = await db.scalar(select(Account).where(Account.email == form_data.username))
+    if account and await hashing_executor.verify_async(form_data.password, account.hashed_password):
+        access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        return {
+            "access_token": create_access_token(
+                account.subject, expires_delta=access_token_expires
+            ),
+            "token_type": "bearer",
+            "user_type": account.role,
+            "user_id": account.principal_id
+        }
+    
+    raise HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Incorrect email or password",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
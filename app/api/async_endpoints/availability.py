@@ -0,0 +1,167 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from datetime import date
+
+from app.database import get_async_db
+from app.models.doctor import Doctor
+from app.models.availability import Availability
+from app.schemas.availability import (
+    Availability as AvailabilitySchema,
+    AvailabilityCreate,
+    AvailabilityUpdate,
+    AvailableSlot
+)
+from app.core.slots import SLOT_DURATION, open_slots
+from app.core.schedule import get_schedule, get_occupancy
+from app.api.async_dependencies import get_current_doctor
+from app.core.availability_cache import (
+    get_cached_availabilities,
+    cache_availabilities,
+    current_generation,
+    serialize_availabilities
+)
+from app.api.endpoints.availability import MAX_SLOT_RANGE_DAYS, cached_availabilities_response
+
+router = APIRouter()
+
+async def get_own_availability(db: AsyncSession, availability_id: int, doctor_id: int):
+    result = await db.execute(select(Availability).where(
+        Availability.id == availability_id,
+        Availability.doctor_id == doctor_id
+    ))
+    db_availability = result.scalars().first()
+    if not db_availability:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Availability not found"
+        )
+    return db_availability
+
+@router.post("/", response_model=AvailabilitySchema, status_code=status.HTTP_201_CREATED)
+async def create_availability(
+    availability_in: AvailabilityCreate,
+    current_doctor: Doctor = Depends(get_current_doctor),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Create new availability
+    db_availability = Availability(
+        doctor_id=current_doctor.id,
+        day_of_week=availability_in.day_of_week,
+        start_time=availability_in.start_time,
+        end_time=availability_in.end_time,
+        is_active=True
+    )
+    db.add(db_availability)
+    await db.commit()
+    await db.refresh(db_availability)
+    return db_availability
+
+@router.get("/", response_model=List[AvailabilitySchema])
+async def read_availabilities(
+    current_doctor: Doctor = Depends(get_current_doctor),
+    db: AsyncSession = Depends(get_async_db)
+):
+    result = await db.execute(select(Availability).where(
+        Availability.doctor_id == current_doctor.id
+    ))
+    return result.scalars().all()
+
+@router.get("/{availability_id}", response_model=AvailabilitySchema)
+async def read_availability(
+    availability_id: int,
+    current_doctor: Doctor = Depends(get_current_doctor),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await get_own_availability(db, availability_id, current_doctor.id)
+
+@router.put("/{availability_id}", response_model=AvailabilitySchema)
+async def update_availability(
+    availability_id: int,
+    availability_in: AvailabilityUpdate,
+    current_doctor: Doctor = Depends(get_current_doctor),
+    db: AsyncSession = Depends(get_async_db)
+):
+    db_availability = await get_own_availability(db, availability_id, current_doctor.id)
+    
+    # Update availability fields
+    update_data = availability_in.dict(exclude_unset=True)
+    for key, value in update_data.items():
+        setattr(db_availability, key, value)
+    
+    db.add(db_availability)
+    await db.commit()
+    await db.refresh(db_availability)
+    return db_availability
+
+@router.delete("/{availability_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_availability(
+    availability_id: int,
+    current_doctor: Doctor = Depends(get_current_doctor),
+    db: AsyncSession = Depends(get_async_db)
+):
+    db_availability = await get_own_availability(db, availability_id, current_doctor.id)
+    await db.delete(db_availability)
+    await db.commit()
+    return None
+
+@router.get("/doctor/{doctor_id}", response_model=List[AvailabilitySchema])
+async def read_doctor_availabilities(
+    doctor_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Served from the availability cache when possible, without a database round trip
+    cached = get_cached_availabilities(doctor_id)
+    if cached is not None:
+        return cached_availabilities_response(request, cached, hit=True)
+    generation = current_generation()
+    
+    # Check if doctor exists
+    if not await db.get(Doctor, doctor_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Doctor not found"
+        )
+    
+    result = await db.execute(select(Availability).where(
+        Availability.doctor_id == doctor_id,
+        Availability.is_active == True
+    ))
+    entry = serialize_availabilities(result.scalars().all())
+    cache_availabilities(doctor_id, entry, generation)
+    return cached_availabilities_response(request, entry, hit=False)
+
+@router.get("/doctor/{doctor_id}/slots", response_model=List[AvailableSlot])
+async def read_doctor_open_slots(
+    doctor_id: int,
+    start_date: date,
+    end_date: date,
+    db: AsyncSession = Depends(get_async_db)
+):
+    if end_date < start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end_date must not be before start_date"
+        )
+    if (end_date - start_date).days >= MAX_SLOT_RANGE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range cannot exceed {MAX_SLOT_RANGE_DAYS} days"
+        )
+    
+    # Check if doctor exists
+    if not await db.get(Doctor, doctor_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Doctor not found"
+        )
+    
+    # Each day's free slots are its weekday's offered slots minus the booked ones
+    schedule = await db.run_sync(get_schedule, doctor_id)
+    occupancy = await db.run_sync(get_occupancy, doctor_id, start_date, end_date)
+    return [
+        AvailableSlot(start=slot, end=slot + SLOT_DURATION)
+        for slot in open_slots(schedule, occupancy, start_date, end_date)
+    ]
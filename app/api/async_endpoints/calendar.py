@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_db
+from app.core.calendar import cached_calendar, get_calendar
+from app.api.endpoints.calendar import calendar_response
+
+router = APIRouter()
+
+@router.get("/{token}.ics", response_class=Response)
+async def read_calendar_feed(
+    token: str,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
+):
+    # No login: the token in the URL is the credential calendar apps can send
+    calendar = cached_calendar(token)
+    if calendar is None:
+        calendar = await db.run_sync(get_calendar, token)
+    return calendar_response(request, calendar)
@@ -0,0 +1,299 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import datetime
+
+from app.database import get_async_db
+from app.models.account import Account
+from app.models.doctor import Doctor, WorkExperience, AcademicHistory
+from app.schemas.doctor import (
+    Doctor as DoctorSchema,
+    DoctorCreate,
+    DoctorUpdate,
+    WorkExperienceCreate,
+    AcademicHistoryCreate,
+    CalendarLink
+)
+from app.schemas.availability import DoctorSlot
+from app.core.hashing import hashing_executor
+from app.core.calendar import new_calendar_token
+from app.core.search import search_doctor_ids
+from app.core.etag import if_none_match, etag_matches, not_modified
+from app.core.fast_json import FastJSONResponse
+from app.core.schedule import find_open_slots
+from app.api.async_dependencies import get_current_doctor
+# Lazy loads are not available under asyncio, so the profile relationships are always eager
+from app.api.endpoints.doctors import (
+    DOCTOR_PROFILE_OPTIONS,
+    DOCTOR_COLUMNS,
+    calendar_link,
+    directory_criteria,
+    directory_page,
+    doctor_etag,
+    doctor_profile_queries,
+    doctor_profiles,
+    doctor_slots,
+    search_start,
+    set_next_cursor
+)
+from app.api.endpoints.availability import MAX_SLOT_RANGE_DAYS
+
+router = APIRouter()
+
+async def load_doctor_profile(db: AsyncSession, doctor_id: int):
+    result = await db.execute(
+        select(Doctor)
+        .where(Doctor.id == doctor_id)
+        .options(*DOCTOR_PROFILE_OPTIONS)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+async def load_doctor_profiles(db: AsyncSession, doctors: list) -> list:
+    if not doctors:
+        return []
+    experiences, histories = [
+        (await db.execute(query)).all() for query in doctor_profile_queries([doctor.id for doctor in doctors])
+    ]
+    return doctor_profiles(doctors, experiences, histories)
+
+@router.post("/", response_model=DoctorSchema, status_code=status.HTTP_201_CREATED)
+async def create_doctor(
+    doctor_in: DoctorCreate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Check if email already exists for a doctor or a patient
+    if await db.scalar(select(Account.id).where(Account.email == doctor_in.email)):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
+    
+    # Create new doctor
+    db_doctor = Doctor(
+        email=doctor_in.email,
+        hashed_password=await hashing_executor.hash_async(doctor_in.password),
+        full_name=doctor_in.full_name,
+        specialization=doctor_in.specialization,
+        phone_number=doctor_in.phone_number
+    )
+    db.add(db_doctor)
+    await db.flush()
+    
+    # Add work experiences
+    for exp in doctor_in.work_experiences or []:
+        db.add(WorkExperience(
+            doctor_id=db_doctor.id,
+            hospital_name=exp.hospital_name,
+            position=exp.position,
+            start_date=exp.start_date,
+            end_date=exp.end_date,
+            description=exp.description
+        ))
+    
+    # Add academic histories
+    for history in doctor_in.academic_histories or []:
+        db.add(AcademicHistory(
+            doctor_id=db_doctor.id,
+            institution=history.institution,
+            degree=history.degree,
+            field_of_study=history.field_of_study,
+            start_date=history.start_date,
+            end_date=history.end_date
+        ))
+    
+    await db.commit()
+    return await load_doctor_profile(db, db_doctor.id)
+
+@router.get("/me", response_model=DoctorSchema)
+async def read_doctor_me(
+    current_doctor: Doctor = Depends(get_current_doctor),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await load_doctor_profile(db, current_doctor.id)
+
+@router.put("/me", response_model=DoctorSchema)
+async def update_doctor_me(
+    doctor_in: DoctorUpdate,
+    current_doctor: Doctor = Depends(get_current_doctor),
+    db: AsyncSession = Depends(get_async_db)
+):
+    if doctor_in.email and doctor_in.email != current_doctor.email:
+        # Check if new email already exists
+        if await db.scalar(select(Account.id).where(Account.email == doctor_in.email)):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Email already registered"
+            )
+    
+    # Update doctor fields
+    update_data = doctor_in.dict(exclude_unset=True)
+    if "password" in update_data:
+        update_data["hashed_password"] = await hashing_executor.hash_async(update_data.pop("password"))
+    
+    for key, value in update_data.items():
+        setattr(current_doctor, key, value)
+    
+    db.add(current_doctor)
+    await db.commit()
+    return await load_doctor_profile(db, current_doctor.id)
+
+@router.post("/me/work-experience", status_code=status.HTTP_201_CREATED)
+async def add_work_experience(
+    experience_in: WorkExperienceCreate,
+    current_doctor: Doctor = Depends(get_current_doctor),
+    db: AsyncSession = Depends(get_async_db)
+):
+    db_exp = WorkExperience(
+        doctor_id=current_doctor.id,
+        hospital_name=experience_in.hospital_name,
+        position=experience_in.position,
+        start_date=experience_in.start_date,
+        end_date=experience_in.end_date,
+        description=experience_in.description
+    )
+    db.add(db_exp)
+    await db.commit()
+    await db.refresh(db_exp)
+    return {"success": True, "id": db_exp.id}
+
+@router.post("/me/academic-history", status_code=status.HTTP_201_CREATED)
+async def add_academic_history(
+    history_in: AcademicHistoryCreate,
+    current_doctor: Doctor = Depends(get_current_doctor),
+    db: AsyncSession = Depends(get_async_db)
+):
+    db_history = AcademicHistory(
+        doctor_id=current_doctor.id,
+        institution=history_in.institution,
+        degree=history_in.degree,
+        field_of_study=history_in.field_of_study,
+        start_date=history_in.start_date,
+        end_date=history_in.end_date
+    )
+    db.add(db_history)
+    await db.commit()
+    await db.refresh(db_history)
+    return {"success": True, "id": db_history.id}
+
+@router.get("/me/calendar", response_model=CalendarLink)
+async def read_calendar_link(
+    request: Request,
+    current_doctor: Doctor = Depends(get_current_doctor),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # The feed URL is created on first request and kept until it is reset
+    token = current_doctor.calendar_token
+    if token is None:
+        token = current_doctor.calendar_token = new_calendar_token()
+        db.add(current_doctor)
+        await db.commit()
+    return calendar_link(request, token)
+
+@router.post("/me/calendar/reset", response_model=CalendarLink)
+async def reset_calendar_link(
+    request: Request,
+    current_doctor: Doctor = Depends(get_current_doctor),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # For a URL that was shared too widely: the old one stops working
+    token = current_doctor.calendar_token = new_calendar_token()
+    db.add(current_doctor)
+    await db.commit()
+    return calendar_link(request, token)
+
+@router.get("/search", response_model=List[DoctorSchema])
+async def search_doctors(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=50),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Best matches first across name, specialization, hospitals and institutions
+    doctor_ids = await db.run_sync(search_doctor_ids, q, limit, offset)
+    if not doctor_ids:
+        return []
+    result = await db.execute(select(*DOCTOR_COLUMNS).where(Doctor.id.in_(doctor_ids)))
+    doctors = {row.id: row for row in result}
+    return FastJSONResponse(
+        await load_doctor_profiles(db, [doctors[doctor_id] for doctor_id in doctor_ids if doctor_id in doctors])
+    )
+
+@router.get("/earliest-available", response_model=List[DoctorSlot])
+async def find_earliest_available(
+    specialization: str = Query(..., min_length=1, max_length=100),
+    after: Optional[datetime] = Query(None, description="Defaults to now"),
+    days: int = Query(14, ge=1, le=MAX_SLOT_RANGE_DAYS, description="How many days ahead to search"),
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Earliest free slots across the specialization's active doctors, merged
+    # from each doctor's slot bitmaps
+    result = await db.execute(select(Doctor.id, Doctor.full_name, Doctor.specialization).where(
+        Doctor.specialization == specialization,
+        Doctor.is_active == True
+    ))
+    doctors = {row.id: row for row in result}
+    slots = await db.run_sync(find_open_slots, list(doctors), search_start(after), days, limit)
+    return doctor_slots(doctors, slots)
+
+@router.get("/{doctor_id}", response_model=DoctorSchema)
+async def read_doctor(
+    doctor_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Revalidation only needs the version, not the profile
+    header = if_none_match(request)
+    if header:
+        result = await db.execute(select(Doctor.id, Doctor.version).where(Doctor.id == doctor_id))
+        row = result.first()
+        if row:
+            etag = doctor_etag([row])
+            if etag_matches(header, etag):
+                return not_modified(etag)
+    
+    db_doctor = await load_doctor_profile(db, doctor_id)
+    if not db_doctor:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Doctor not found"
+        )
+    response.headers["ETag"] = doctor_etag([db_doctor])
+    return db_doctor
+
+@router.get("/", response_model=List[DoctorSchema])
+async def read_doctors(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    specialization: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    skip: int = Query(0, ge=0, deprecated=True, description="Use cursor instead"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    criteria = directory_criteria(cursor, specialization, is_active)
+    
+    # Revalidate against the page's row versions before loading full profiles
+    header = if_none_match(request)
+    if header:
+        result = await db.execute(
+            directory_page(select(Doctor.id, Doctor.version).where(*criteria), cursor, skip, limit)
+        )
+        rows = result.all()
+        etag = doctor_etag(rows, limit)
+        if etag_matches(header, etag):
+            unchanged = not_modified(etag)
+            set_next_cursor(unchanged, rows, limit)
+            return unchanged
+    
+    stmt = select(*DOCTOR_COLUMNS, Doctor.version).where(*criteria)
+    result = await db.execute(directory_page(stmt, cursor, skip, limit))
+    doctors = result.all()
+    page = FastJSONResponse(
+        await load_doctor_profiles(db, doctors[:limit]), headers={"ETag": doctor_etag(doctors, limit)}
+    )
+    set_next_cursor(page, doctors, limit)
+    return page
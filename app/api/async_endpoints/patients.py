@@ -0,0 +1,84 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_db
+from app.models.account import Account
+from app.models.patient import Patient
+from app.schemas.patient import Patient as PatientSchema, PatientCreate, PatientUpdate
+from app.core.hashing import hashing_executor
+from app.api.async_dependencies import get_current_patient
+
+router = APIRouter()
+
+@router.post("/", response_model=PatientSchema, status_code=status.HTTP_201_CREATED)
+async def create_patient(
+    patient_in: PatientCreate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Check if email already exists for a doctor or a patient
+    if await db.scalar(select(Account.id).where(Account.email == patient_in.email)):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
+    
+    # Create new patient
+    db_patient = Patient(
+        email=patient_in.email,
+        hashed_password=await hashing_executor.hash_async(patient_in.password),
+        full_name=patient_in.full_name,
+        date_of_birth=patient_in.date_of_birth,
+        phone_number=patient_in.phone_number,
+        address=patient_in.address
+    )
+    db.add(db_patient)
+    await db.commit()
+    await db.refresh(db_patient)
+    return db_patient
+
+@router.get("/me", response_model=PatientSchema)
+async def read_patient_me(
+    current_patient: Patient = Depends(get_current_patient)
+):
+    return current_patient
+
+@router.put("/me", response_model=PatientSchema)
+async def update_patient_me(
+    patient_in: PatientUpdate,
+    current_patient: Patient = Depends(get_current_patient),
+    db: AsyncSession = Depends(get_async_db)
+):
+    if patient_in.email and patient_in.email != current_patient.email:
+        # Check if new email already exists
+        if await db.scalar(select(Account.id).where(Account.email == patient_in.email)):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Email already registered"
+            )
+    
+    # Update patient fields
+    update_data = patient_in.dict(exclude_unset=True)
+    if "password" in update_data:
+        update_data["hashed_password"] = await hashing_executor.hash_async(update_data.pop("password"))
+    
+    for key, value in update_data.items():
+        setattr(current_patient, key, value)
+    
+    db.add(current_patient)
+    await db.commit()
+    await db.refresh(current_patient)
+    return current_patient
+
+@router.get("/{patient_id}", response_model=PatientSchema)
+async def read_patient(
+    patient_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    db_patient = await db.get(Patient, patient_id)
+    if not db_patient:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Patient not found"
+        )
+    return db_patient
@@ -4,8 +4,10 @@ from jose import JWTError, jwt
 from pydantic import ValidationError
 from sqlalchemy.orm import Session
 from typing import Optional, Union
+import time
 
 from app.core.security import create_access_token
+from app.core.auth_cache import token_cache, get_cached_principal, cache_principal
 from app.database import get_db
 from app.models.doctor import Doctor
 from app.models.patient import Patient
@@ -15,20 +17,36 @@ oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/login"
 )
 
+def decode_token_subject(token: str) -> str:
+    # Tokens that already verified are cached until the earlier of their expiry and the cache TTL
+    user_id = token_cache.get(token)
+    if user_id:
+        return user_id
+    
+    payload = jwt.decode(
+        token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+    )
+    user_id: str = payload.get("sub")
+    if not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    expires_at = payload.get("exp")
+    token_cache.set(token, user_id, ttl=expires_at - time.time() if expires_at else None)
+    return user_id
+
 def get_current_user(
     db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
 ) -> Union[Doctor, Patient]:
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        user_id: str = payload.get("sub")
-        if not user_id:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+        user_id = decode_token_subject(token)
+        
+        cached_user = get_cached_principal(user_id)
+        if cached_user is not None:
+            # Attach a session-local copy without a round-trip
+            return db.merge(cached_user, load=False)
         
         # Check if it's a doctor (first character: D) or patient (first character: P)
         if user_id.startswith("D"):
@@ -36,12 +54,14 @@ def get_current_user(
             user = db.query(Doctor).filter(Doctor.id == doctor_id).first()
             if not user:
                 raise HTTPException(status_code=404, detail="Doctor not found")
+            cache_principal(user)
             return user
         elif user_id.startswith("P"):
             patient_id = int(user_id[1:])
             user = db.query(Patient).filter(Patient.id == patient_id).first()
             if not user:
                 raise HTTPException(status_code=404, detail="Patient not found")
+            cache_principal(user)
             return user
         else:
             raise HTTPException(
@@ -1,19 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, or_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
-from datetime import datetime, timedelta
+from typing import List, Optional
+from datetime import datetime
 
 from app.database import get_db
 from app.models.doctor import Doctor
 from app.models.patient import Patient
-from app.models.appointment import Appointment, AppointmentStatus
+from app.models.appointment import Appointment, AppointmentStatus, ACTIVE_STATUSES
 from app.models.availability import Availability
 from app.schemas.appointment import (
     Appointment as AppointmentSchema,
     AppointmentCreate,
     AppointmentUpdate,
-    AppointmentReschedule
+    AppointmentReschedule,
+    AppointmentBatchCreate,
+    AppointmentBatchItemResult,
+    AppointmentBatchResult
 )
+from app.core.booking import SLOT_TAKEN, insert_batch, validate_batch
+from app.core.slots import local_naive, slot_start
+from app.core.schedule import current_schedule
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.etag import make_etag, if_none_match, etag_matches, not_modified
+from app.core.export import EXPORT_FORMATS, ExportFormat, export_filename, stream_appointments
+from app.core.fast_json import FastJSONResponse, schema_columns, rows_to_dicts
 from app.api.dependencies import get_current_doctor, get_current_patient
 
 router = APIRouter()
@@ -23,33 +36,22 @@ def check_availability(
     doctor_id: int,
     appointment_datetime: datetime
 ):
-    # Check if the doctor has availability for this day and time
-    weekday = appointment_datetime.strftime("%A")  # Monday, Tuesday, etc.
-    time = appointment_datetime.time()
-    
-    availability = db.query(Availability).filter(
-        Availability.doctor_id == doctor_id,
-        Availability.day_of_week == weekday,
-        Availability.start_time <= time,
-        Availability.end_time >= time,
-        Availability.is_active == True
-    ).first()
-    
-    if not availability:
-        return False
-    
-    # Check if there's already an appointment at this time
-    existing_appointment = db.query(Appointment).filter(
-        Appointment.doctor_id == doctor_id,
-        Appointment.appointment_datetime >= appointment_datetime,
-        Appointment.appointment_datetime < appointment_datetime + timedelta(minutes=30),
-        Appointment.status.in_([AppointmentStatus.PENDING, AppointmentStatus.CONFIRMED])
-    ).first()
-    
-    if existing_appointment:
-        return False
-    
-    return True
+    # A bit test against the doctor's weekly slot bitmap, checked against the
+    # database's schedule_version so availability removed by another worker is
+    # honoured; slot conflicts are left to the unique slot index, see flush_booking
+    return current_schedule(db, doctor_id).is_available(appointment_datetime)
+
+def flush_booking(db: Session):
+    # Write the booking; a second active appointment in the same doctor slot
+    # violates uq_appointments_doctor_slot_active, even under concurrent requests
+    try:
+        db.flush()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=SLOT_TAKEN
+        )
 
 @router.post("/", response_model=AppointmentSchema, status_code=status.HTTP_201_CREATED)
 def create_appointment(
@@ -82,29 +84,203 @@ def create_appointment(
         status=AppointmentStatus.PENDING
     )
     db.add(db_appointment)
+    flush_booking(db)
     db.commit()
     db.refresh(db_appointment)
     return db_appointment
 
+@router.post("/batch", response_model=AppointmentBatchResult)
+def create_appointments_batch(
+    batch_in: AppointmentBatchCreate,
+    current_patient: Patient = Depends(get_current_patient),
+    db: Session = Depends(get_db)
+):
+    items = batch_in.appointments
+    requested = [(item.doctor_id, item.appointment_datetime) for item in items]
+    
+    # Load everything the batch needs with one query per table
+    doctor_ids = {
+        row.id for row in db.query(Doctor.id).filter(
+            Doctor.id.in_({item.doctor_id for item in items})
+        )
+    }
+    availabilities = db.query(Availability).filter(
+        Availability.doctor_id.in_(doctor_ids),
+        Availability.is_active == True
+    ).all()
+    slots = [slot_start(appointment_datetime) for _, appointment_datetime in requested]
+    booked = db.query(Appointment.doctor_id, Appointment.slot_start).filter(
+        Appointment.doctor_id.in_(doctor_ids),
+        Appointment.slot_start >= min(slots),
+        Appointment.slot_start <= max(slots),
+        Appointment.status.in_(ACTIVE_STATUSES)
+    ).all()
+    
+    errors = validate_batch(requested, doctor_ids, availabilities, booked)
+    
+    created = insert_batch(db, current_patient.id, items, requested, errors)
+    
+    # Serialize before commit so the new rows don't have to be reloaded one by one
+    results = [
+        AppointmentBatchItemResult(
+            index=index,
+            success=error is None,
+            appointment=AppointmentSchema.model_validate(created[index]) if error is None else None,
+            error=error
+        )
+        for index, error in enumerate(errors)
+    ]
+    db.commit()
+    return AppointmentBatchResult(
+        created=len(created), failed=len(items) - len(created), results=results
+    )
+
+def appointment_etag(appointments: list, *extra) -> str:
+    return make_etag(
+        "appointments", [(appointment.id, appointment.version) for appointment in appointments], *extra
+    )
+
+# Listings run in (appointment_datetime, id) order, which the
+# (doctor_id|patient_id, appointment_datetime) indexes serve directly
+APPOINTMENT_ORDER = (Appointment.appointment_datetime, Appointment.id)
+# Columns behind AppointmentSchema, for the list endpoints' fast path
+APPOINTMENT_COLUMNS = schema_columns(AppointmentSchema, Appointment)
+
+def appointment_criteria(
+    cursor: Optional[str],
+    start: Optional[datetime],
+    end: Optional[datetime],
+    statuses: Optional[List[AppointmentStatus]]
+) -> list:
+    # Without an explicit window only upcoming appointments are listed; aware
+    # bounds are compared as the naive local times the rows store
+    start = datetime.now() if start is None else local_naive(start)
+    if end is not None:
+        end = local_naive(end)
+    if end is not None and end < start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'to' must not be before 'from'"
+        )
+    
+    criteria = [Appointment.appointment_datetime >= start]
+    if end is not None:
+        criteria.append(Appointment.appointment_datetime < end)
+    if statuses:
+        criteria.append(Appointment.status.in_(statuses))
+    if cursor:
+        try:
+            position = decode_cursor(cursor)
+            after = (local_naive(datetime.fromisoformat(position["at"])), int(position["id"]))
+        except (ValueError, KeyError, TypeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        criteria.append(or_(
+            Appointment.appointment_datetime > after[0],
+            and_(Appointment.appointment_datetime == after[0], Appointment.id > after[1])
+        ))
+    return criteria
+
+def set_appointment_cursor(response: Response, appointments: list, limit: int) -> list:
+    # One extra row is fetched to know whether another page exists
+    if len(appointments) > limit:
+        appointments = appointments[:limit]
+        last = appointments[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(
+            {"at": last.appointment_datetime.isoformat(), "id": last.id}
+        )
+    return appointments
+
+def list_appointments(db: Session, request: Request, limit: int, *criteria):
+    # Revalidate against row versions before loading and serializing full rows
+    header = if_none_match(request)
+    if header:
+        rows = db.query(Appointment.id, Appointment.version, Appointment.appointment_datetime).filter(
+            *criteria
+        ).order_by(*APPOINTMENT_ORDER).limit(limit + 1).all()
+        etag = appointment_etag(rows, limit)
+        if etag_matches(header, etag):
+            unchanged = not_modified(etag)
+            set_appointment_cursor(unchanged, rows, limit)
+            return unchanged
+    
+    appointments = db.query(*APPOINTMENT_COLUMNS, Appointment.version).filter(
+        *criteria
+    ).order_by(*APPOINTMENT_ORDER).limit(limit + 1).all()
+    page = FastJSONResponse(
+        rows_to_dicts(appointments[:limit], APPOINTMENT_COLUMNS),
+        headers={"ETag": appointment_etag(appointments, limit)}
+    )
+    set_appointment_cursor(page, appointments, limit)
+    return page
+
 @router.get("/doctor", response_model=List[AppointmentSchema])
 def read_doctor_appointments(
+    request: Request,
+    start: Optional[datetime] = Query(None, alias="from", description="Defaults to now"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    statuses: Optional[List[AppointmentStatus]] = Query(None, alias="status"),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
     current_doctor: Doctor = Depends(get_current_doctor),
     db: Session = Depends(get_db)
 ):
-    appointments = db.query(Appointment).filter(
-        Appointment.doctor_id == current_doctor.id
-    ).all()
-    return appointments
+    criteria = appointment_criteria(cursor, start, end, statuses)
+    return list_appointments(
+        db, request, limit, Appointment.doctor_id == current_doctor.id, *criteria
+    )
 
 @router.get("/patient", response_model=List[AppointmentSchema])
 def read_patient_appointments(
+    request: Request,
+    start: Optional[datetime] = Query(None, alias="from", description="Defaults to now"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    statuses: Optional[List[AppointmentStatus]] = Query(None, alias="status"),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
     current_patient: Patient = Depends(get_current_patient),
     db: Session = Depends(get_db)
 ):
-    appointments = db.query(Appointment).filter(
-        Appointment.patient_id == current_patient.id
-    ).all()
-    return appointments
+    criteria = appointment_criteria(cursor, start, end, statuses)
+    return list_appointments(
+        db, request, limit, Appointment.patient_id == current_patient.id, *criteria
+    )
+
+@router.get("/doctor/export")
+def export_doctor_appointments(
+    request: Request,
+    format: ExportFormat = "ndjson",
+    current_doctor: Doctor = Depends(get_current_doctor)
+):
+    # Full history, written to the response as it is read
+    return StreamingResponse(
+        stream_appointments(
+            format, f"{request.method} {request.url.path}", Appointment.doctor_id == current_doctor.id
+        ),
+        media_type=EXPORT_FORMATS[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{export_filename("doctor", current_doctor.id, format)}"'
+        }
+    )
+
+@router.get("/patient/export")
+def export_patient_appointments(
+    request: Request,
+    format: ExportFormat = "ndjson",
+    current_patient: Patient = Depends(get_current_patient)
+):
+    # Full history, written to the response as it is read
+    return StreamingResponse(
+        stream_appointments(
+            format, f"{request.method} {request.url.path}", Appointment.patient_id == current_patient.id
+        ),
+        media_type=EXPORT_FORMATS[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{export_filename("patient", current_patient.id, format)}"'
+        }
+    )
 
 @router.put("/{appointment_id}/cancel", response_model=AppointmentSchema)
 def cancel_appointment(
@@ -170,9 +346,12 @@ def reschedule_appointment(
             detail="Doctor is not available at this time"
         )
     
+    # The version check rejects a concurrent change to this appointment and the
+    # slot index a concurrent booking of the new slot; both surface as 409
     db_appointment.appointment_datetime = reschedule_in.appointment_datetime
     db_appointment.status = AppointmentStatus.RESCHEDULED
     db.add(db_appointment)
+    flush_booking(db)
     db.commit()
     db.refresh(db_appointment)
     return db_appointment
\ No newline at end of file
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Tuple
+from datetime import date
 
 from app.database import get_db
 from app.models.doctor import Doctor
@@ -8,12 +9,24 @@ from app.models.availability import Availability
 from app.schemas.availability import (
     Availability as AvailabilitySchema,
     AvailabilityCreate,
-    AvailabilityUpdate
+    AvailabilityUpdate,
+    AvailableSlot
 )
+from app.core.slots import SLOT_DURATION, open_slots
+from app.core.schedule import get_schedule, get_occupancy
+from app.core.availability_cache import (
+    get_cached_availabilities,
+    cache_availabilities,
+    current_generation,
+    serialize_availabilities
+)
+from app.core.etag import if_none_match, etag_matches, not_modified
 from app.api.dependencies import get_current_doctor
 
 router = APIRouter()
 
+MAX_SLOT_RANGE_DAYS = 31
+
 @router.post("/", response_model=AvailabilitySchema, status_code=status.HTTP_201_CREATED)
 def create_availability(
     availability_in: AvailabilityCreate,
@@ -106,11 +119,25 @@ def delete_availability(
     db.commit()
     return None
 
+def cached_availabilities_response(request: Request, entry: Tuple[str, bytes], hit: bool) -> Response:
+    etag, body = entry
+    headers = {"ETag": etag, "X-Cache": "HIT" if hit else "MISS"}
+    if etag_matches(if_none_match(request), etag):
+        return not_modified(etag, headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
 @router.get("/doctor/{doctor_id}", response_model=List[AvailabilitySchema])
 def read_doctor_availabilities(
     doctor_id: int,
+    request: Request,
     db: Session = Depends(get_db)
 ):
+    # Served from the availability cache when possible, without a database round trip
+    cached = get_cached_availabilities(doctor_id)
+    if cached is not None:
+        return cached_availabilities_response(request, cached, hit=True)
+    generation = current_generation()
+    
     # Check if doctor exists
     doctor = db.query(Doctor).filter(Doctor.id == doctor_id).first()
     if not doctor:
@@ -123,4 +150,40 @@ def read_doctor_availabilities(
         Availability.doctor_id == doctor_id,
         Availability.is_active == True
     ).all()
-    return availabilities
\ No newline at end of file
+    entry = serialize_availabilities(availabilities)
+    cache_availabilities(doctor_id, entry, generation)
+    return cached_availabilities_response(request, entry, hit=False)
+
+@router.get("/doctor/{doctor_id}/slots", response_model=List[AvailableSlot])
+def read_doctor_open_slots(
+    doctor_id: int,
+    start_date: date,
+    end_date: date,
+    db: Session = Depends(get_db)
+):
+    if end_date < start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end_date must not be before start_date"
+        )
+    if (end_date - start_date).days >= MAX_SLOT_RANGE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range cannot exceed {MAX_SLOT_RANGE_DAYS} days"
+        )
+    
+    # Check if doctor exists
+    doctor = db.query(Doctor).filter(Doctor.id == doctor_id).first()
+    if not doctor:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Doctor not found"
+        )
+    
+    # Each day's free slots are its weekday's offered slots minus the booked ones
+    schedule = get_schedule(db, doctor_id)
+    occupancy = get_occupancy(db, doctor_id, start_date, end_date)
+    return [
+        AvailableSlot(start=slot, end=slot + SLOT_DURATION)
+        for slot in open_slots(schedule, occupancy, start_date, end_date)
+    ]
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.core.calendar import get_calendar
+from app.core.etag import http_date, is_not_modified, not_modified
+
+router = APIRouter()
+
+CALENDAR_MEDIA_TYPE = "text/calendar; charset=utf-8"
+
+def calendar_response(request: Request, calendar) -> Response:
+    if calendar is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Calendar not found"
+        )
+    etag, body, last_modified = calendar
+    # Clients poll the feed, so let them revalidate rather than re-download it
+    headers = {"Last-Modified": http_date(last_modified), "Cache-Control": "private, no-cache"}
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(etag, headers)
+    return Response(content=body, media_type=CALENDAR_MEDIA_TYPE, headers={"ETag": etag, **headers})
+
+@router.get("/{token}.ics", response_class=Response)
+def read_calendar_feed(
+    token: str,
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    # No login: the token in the URL is the credential calendar apps can send
+    return calendar_response(request, get_calendar(db, token))
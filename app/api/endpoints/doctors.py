@@ -1,29 +1,58 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Optional
+from datetime import datetime
 
 from app.database import get_db
+from app.models.account import Account
 from app.models.doctor import Doctor, WorkExperience, AcademicHistory
 from app.schemas.doctor import (
     Doctor as DoctorSchema,
     DoctorCreate,
     DoctorUpdate,
     WorkExperienceCreate,
-    AcademicHistoryCreate
+    WorkExperienceInDB,
+    AcademicHistoryCreate,
+    AcademicHistoryInDB,
+    CalendarLink
 )
-from app.core.security import get_password_hash
+from app.schemas.availability import DoctorSlot
+from app.core.hashing import hashing_executor
+from app.core.calendar import new_calendar_token
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.search import search_doctor_ids
+from app.core.etag import make_etag, if_none_match, etag_matches, not_modified
+from app.core.fast_json import FastJSONResponse, schema_columns, rows_to_dicts
+from app.core.slots import SLOT_DURATION, local_naive
+from app.core.schedule import find_open_slots
+from app.api.endpoints.availability import MAX_SLOT_RANGE_DAYS
 from app.api.dependencies import get_current_doctor
 
 router = APIRouter()
 
+# Relationships serialized by DoctorSchema, loaded in one extra query each
+# rather than lazily per doctor
+DOCTOR_PROFILE_OPTIONS = (
+    selectinload(Doctor.work_experiences),
+    selectinload(Doctor.academic_histories),
+)
+
+def calendar_link(request: Request, token: str) -> CalendarLink:
+    return CalendarLink(url=str(request.url_for("read_calendar_feed", token=token)))
+
+def load_doctor_profile(db: Session, doctor_id: int):
+    return db.query(Doctor).options(*DOCTOR_PROFILE_OPTIONS).populate_existing().filter(
+        Doctor.id == doctor_id
+    ).first()
+
 @router.post("/", response_model=DoctorSchema, status_code=status.HTTP_201_CREATED)
 def create_doctor(
     doctor_in: DoctorCreate,
     db: Session = Depends(get_db)
 ):
-    # Check if email already exists
-    db_doctor = db.query(Doctor).filter(Doctor.email == doctor_in.email).first()
-    if db_doctor:
+    # Check if email already exists for a doctor or a patient
+    if db.query(Account.id).filter(Account.email == doctor_in.email).first():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
@@ -32,14 +61,13 @@ def create_doctor(
     # Create new doctor
     db_doctor = Doctor(
         email=doctor_in.email,
-        hashed_password=get_password_hash(doctor_in.password),
+        hashed_password=hashing_executor.hash(doctor_in.password),
         full_name=doctor_in.full_name,
         specialization=doctor_in.specialization,
         phone_number=doctor_in.phone_number
     )
     db.add(db_doctor)
-    db.commit()
-    db.refresh(db_doctor)
+    db.flush()
     
     # Add work experiences
     if doctor_in.work_experiences:
@@ -68,8 +96,7 @@ def create_doctor(
             db.add(db_history)
     
     db.commit()
-    db.refresh(db_doctor)
-    return db_doctor
+    return load_doctor_profile(db, db_doctor.id)
 
 @router.get("/me", response_model=DoctorSchema)
 def read_doctor_me(
@@ -86,8 +113,7 @@ def update_doctor_me(
 ):
     if doctor_in.email and doctor_in.email != current_doctor.email:
         # Check if new email already exists
-        db_doctor = db.query(Doctor).filter(Doctor.email == doctor_in.email).first()
-        if db_doctor:
+        if db.query(Account.id).filter(Account.email == doctor_in.email).first():
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered"
@@ -96,15 +122,14 @@ def update_doctor_me(
     # Update doctor fields
     update_data = doctor_in.dict(exclude_unset=True)
     if "password" in update_data:
-        update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
+        update_data["hashed_password"] = hashing_executor.hash(update_data.pop("password"))
     
     for key, value in update_data.items():
         setattr(current_doctor, key, value)
     
     db.add(current_doctor)
     db.commit()
-    db.refresh(current_doctor)
-    return current_doctor
+    return load_doctor_profile(db, current_doctor.id)
 
 @router.post("/me/work-experience", status_code=status.HTTP_201_CREATED)
 def add_work_experience(
@@ -144,24 +169,206 @@ def add_academic_history(
     db.refresh(db_history)
     return {"success": True, "id": db_history.id}
 
+@router.get("/me/calendar", response_model=CalendarLink)
+def read_calendar_link(
+    request: Request,
+    current_doctor: Doctor = Depends(get_current_doctor),
+    db: Session = Depends(get_db)
+):
+    # The feed URL is created on first request and kept until it is reset
+    token = current_doctor.calendar_token
+    if token is None:
+        token = current_doctor.calendar_token = new_calendar_token()
+        db.add(current_doctor)
+        db.commit()
+    return calendar_link(request, token)
+
+@router.post("/me/calendar/reset", response_model=CalendarLink)
+def reset_calendar_link(
+    request: Request,
+    current_doctor: Doctor = Depends(get_current_doctor),
+    db: Session = Depends(get_db)
+):
+    # For a URL that was shared too widely: the old one stops working
+    token = current_doctor.calendar_token = new_calendar_token()
+    db.add(current_doctor)
+    db.commit()
+    return calendar_link(request, token)
+
+# Columns behind DoctorSchema, for the list endpoints' fast path
+DOCTOR_COLUMNS = schema_columns(DoctorSchema, Doctor)
+EXPERIENCE_COLUMNS = schema_columns(WorkExperienceInDB, WorkExperience)
+HISTORY_COLUMNS = schema_columns(AcademicHistoryInDB, AcademicHistory)
+
+def doctor_profile_queries(doctor_ids: List[int]) -> tuple:
+    # One query per relationship for the whole page, as selectinload would issue
+    return (
+        select(*EXPERIENCE_COLUMNS).where(WorkExperience.doctor_id.in_(doctor_ids)).order_by(WorkExperience.id),
+        select(*HISTORY_COLUMNS).where(AcademicHistory.doctor_id.in_(doctor_ids)).order_by(AcademicHistory.id),
+    )
+
+def doctor_profiles(doctors: list, experiences: list, histories: list) -> list:
+    # Rows to DoctorSchema-shaped dicts, ready for FastJSONResponse
+    profiles = rows_to_dicts(doctors, DOCTOR_COLUMNS)
+    by_id = {}
+    for profile in profiles:
+        profile["work_experiences"] = []
+        profile["academic_histories"] = []
+        by_id[profile["id"]] = profile
+    for experience in rows_to_dicts(experiences, EXPERIENCE_COLUMNS):
+        by_id[experience["doctor_id"]]["work_experiences"].append(experience)
+    for history in rows_to_dicts(histories, HISTORY_COLUMNS):
+        by_id[history["doctor_id"]]["academic_histories"].append(history)
+    return profiles
+
+def load_doctor_profiles(db: Session, doctors: list) -> list:
+    if not doctors:
+        return []
+    experiences, histories = (
+        db.execute(query).all() for query in doctor_profile_queries([doctor.id for doctor in doctors])
+    )
+    return doctor_profiles(doctors, experiences, histories)
+
+def load_doctors_in_order(db: Session, doctor_ids: List[int]) -> list:
+    doctors = {row.id: row for row in db.execute(select(*DOCTOR_COLUMNS).where(Doctor.id.in_(doctor_ids)))}
+    return load_doctor_profiles(db, [doctors[doctor_id] for doctor_id in doctor_ids if doctor_id in doctors])
+
+@router.get("/search", response_model=List[DoctorSchema])
+def search_doctors(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=50),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
+    # Best matches first across name, specialization, hospitals and institutions
+    doctor_ids = search_doctor_ids(db, q, limit, offset)
+    if not doctor_ids:
+        return []
+    return FastJSONResponse(load_doctors_in_order(db, doctor_ids))
+
+def search_start(after: Optional[datetime]) -> datetime:
+    return datetime.now() if after is None else local_naive(after)
+
+def doctor_slots(doctors: dict, slots: list) -> List[DoctorSlot]:
+    return [
+        DoctorSlot(
+            doctor_id=doctor_id,
+            full_name=doctors[doctor_id].full_name,
+            specialization=doctors[doctor_id].specialization,
+            start=slot,
+            end=slot + SLOT_DURATION
+        )
+        for slot, doctor_id in slots
+    ]
+
+@router.get("/earliest-available", response_model=List[DoctorSlot])
+def find_earliest_available(
+    specialization: str = Query(..., min_length=1, max_length=100),
+    after: Optional[datetime] = Query(None, description="Defaults to now"),
+    days: int = Query(14, ge=1, le=MAX_SLOT_RANGE_DAYS, description="How many days ahead to search"),
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    # Earliest free slots across the specialization's active doctors, merged
+    # from each doctor's slot bitmaps
+    doctors = {
+        row.id: row for row in db.query(Doctor.id, Doctor.full_name, Doctor.specialization).filter(
+            Doctor.specialization == specialization,
+            Doctor.is_active == True
+        )
+    }
+    return doctor_slots(doctors, find_open_slots(db, doctors, search_start(after), days, limit))
+
+def doctor_etag(doctors: list, *extra) -> str:
+    # The doctor version also moves when experience or history rows change
+    return make_etag("doctors", [(doctor.id, doctor.version) for doctor in doctors], *extra)
+
 @router.get("/{doctor_id}", response_model=DoctorSchema)
 def read_doctor(
     doctor_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ):
-    db_doctor = db.query(Doctor).filter(Doctor.id == doctor_id).first()
+    # Revalidation only needs the version, not the profile
+    header = if_none_match(request)
+    if header:
+        row = db.query(Doctor.id, Doctor.version).filter(Doctor.id == doctor_id).first()
+        if row:
+            etag = doctor_etag([row])
+            if etag_matches(header, etag):
+                return not_modified(etag)
+    
+    db_doctor = load_doctor_profile(db, doctor_id)
     if not db_doctor:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Doctor not found"
         )
+    response.headers["ETag"] = doctor_etag([db_doctor])
     return db_doctor
 
+def directory_criteria(
+    cursor: Optional[str],
+    specialization: Optional[str],
+    is_active: Optional[bool]
+) -> list:
+    criteria = []
+    if specialization is not None:
+        criteria.append(Doctor.specialization == specialization)
+    if is_active is not None:
+        criteria.append(Doctor.is_active == is_active)
+    if cursor:
+        try:
+            after_id = int(decode_cursor(cursor)["id"])
+        except (ValueError, KeyError, TypeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        criteria.append(Doctor.id > after_id)
+    return criteria
+
+def directory_page(query, cursor: Optional[str], skip: int, limit: int):
+    # Works on both Query and select(); one extra row tells whether another page exists
+    query = query.order_by(Doctor.id)
+    if skip and not cursor:
+        query = query.offset(skip)
+    return query.limit(limit + 1)
+
+def set_next_cursor(response: Response, doctors: list, limit: int) -> list:
+    # One extra row is fetched to know whether another page exists
+    if len(doctors) > limit:
+        doctors = doctors[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor({"id": doctors[-1].id})
+    return doctors
+
 @router.get("/", response_model=List[DoctorSchema])
 def read_doctors(
-    skip: int = 0,
-    limit: int = 100,
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    specialization: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    skip: int = Query(0, ge=0, deprecated=True, description="Use cursor instead"),
     db: Session = Depends(get_db)
 ):
-    doctors = db.query(Doctor).offset(skip).limit(limit).all()
-    return doctors
\ No newline at end of file
+    criteria = directory_criteria(cursor, specialization, is_active)
+    
+    # Revalidate against the page's row versions before loading full profiles
+    header = if_none_match(request)
+    if header:
+        rows = directory_page(db.query(Doctor.id, Doctor.version).filter(*criteria), cursor, skip, limit).all()
+        etag = doctor_etag(rows, limit)
+        if etag_matches(header, etag):
+            unchanged = not_modified(etag)
+            set_next_cursor(unchanged, rows, limit)
+            return unchanged
+    
+    query = select(*DOCTOR_COLUMNS, Doctor.version).where(*criteria)
+    doctors = db.execute(directory_page(query, cursor, skip, limit)).all()
+    page = FastJSONResponse(
+        load_doctor_profiles(db, doctors[:limit]), headers={"ETag": doctor_etag(doctors, limit)}
+    )
+    set_next_cursor(page, doctors, limit)
+    return page
\ No newline at end of file
@@ -3,9 +3,10 @@ from sqlalchemy.orm import Session
 from typing import List
 
 from app.database import get_db
+from app.models.account import Account
 from app.models.patient import Patient
 from app.schemas.patient import Patient as PatientSchema, PatientCreate, PatientUpdate
-from app.core.security import get_password_hash
+from app.core.hashing import hashing_executor
 from app.api.dependencies import get_current_patient
 
 router = APIRouter()
@@ -15,9 +16,8 @@ def create_patient(
     patient_in: PatientCreate,
     db: Session = Depends(get_db)
 ):
-    # Check if email already exists
-    db_patient = db.query(Patient).filter(Patient.email == patient_in.email).first()
-    if db_patient:
+    # Check if email already exists for a doctor or a patient
+    if db.query(Account.id).filter(Account.email == patient_in.email).first():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
@@ -26,7 +26,7 @@ def create_patient(
     # Create new patient
     db_patient = Patient(
         email=patient_in.email,
-        hashed_password=get_password_hash(patient_in.password),
+        hashed_password=hashing_executor.hash(patient_in.password),
         full_name=patient_in.full_name,
         date_of_birth=patient_in.date_of_birth,
         phone_number=patient_in.phone_number,
@@ -52,8 +52,7 @@ def update_patient_me(
 ):
     if patient_in.email and patient_in.email != current_patient.email:
         # Check if new email already exists
-        db_patient = db.query(Patient).filter(Patient.email == patient_in.email).first()
-        if db_patient:
+        if db.query(Account.id).filter(Account.email == patient_in.email).first():
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered"
@@ -62,7 +61,7 @@ def update_patient_me(
     # Update patient fields
     update_data = patient_in.dict(exclude_unset=True)
     if "password" in update_data:
-        update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
+        update_data["hashed_password"] = hashing_executor.hash(update_data.pop("password"))
     
     for key, value in update_data.items():
         setattr(current_patient, key, value)
@@ -0,0 +1,303 @@
+"""Bulk import of doctors, patients and availabilities from CSV or NDJSON.
+
+Rows are streamed from the file, validated with the API's Pydantic schemas and
+written in batches, one transaction per batch, so memory stays bounded by
+--batch-size. Passwords of a batch are hashed in parallel on a process pool.
+After every committed batch the position is saved to a checkpoint file; if
+the run is interrupted, running the same command again resumes after the last
+committed batch (a finished import is only repeated with --restart). Rejected
+rows are appended to an NDJSON errors file with their row number and reason.
+
+Doctor rows may carry `work_experiences` and `academic_histories` lists (JSON
+encoded in CSV columns). Availability rows identify the doctor by
+`doctor_email` or `doctor_id`.
+
+Usage:
+    python -m app.bulk_import doctors doctors.csv
+    python -m app.bulk_import patients patients.ndjson --batch-size 1000 --workers 8
+    python -m app.bulk_import availabilities availabilities.csv --restart
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Doctor, WorkExperience, AcademicHistory, Patient, Availability, Account
+from app.schemas import DoctorCreate, PatientCreate, AvailabilityCreate
+from app.core.hashing import HashingExecutor
+from app.core.security import get_password_hash
+import app.core.search  # noqa: F401  keeps the doctor search index in sync
+
+EMAIL_TAKEN = "Email already registered"
+DOCTOR_NOT_FOUND = "Doctor not found"
+DUPLICATE_AVAILABILITY = "Availability already exists"
+
+class AvailabilityImport(AvailabilityCreate):
+    doctor_email: Optional[str] = None
+    doctor_id: Optional[int] = None
+
+SCHEMAS = {
+    "doctors": DoctorCreate,
+    "patients": PatientCreate,
+    "availabilities": AvailabilityImport,
+}
+# CSV columns holding JSON-encoded lists
+NESTED_COLUMNS = ("work_experiences", "academic_histories")
+
+def read_records(path: str, file_format: str) -> Iterator[Union[dict, ValueError]]:
+    with open(path, newline="", encoding="utf-8") as f:
+        if file_format == "csv":
+            for row in csv.DictReader(f):
+                # Empty cells mean "not provided" so optional fields fall back to their defaults
+                record = {key: value for key, value in row.items() if value not in ("", None)}
+                try:
+                    for column in NESTED_COLUMNS:
+                        if column in record:
+                            record[column] = json.loads(record[column])
+                except ValueError as exc:
+                    record = exc
+                yield record
+        else:
+            for line in f:
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except ValueError as exc:
+                        yield exc
+
+def validate(schema, record) -> Tuple[Optional[BaseModel], Optional[str]]:
+    # Rows that could not even be parsed arrive as the parsing error
+    if isinstance(record, ValueError):
+        return None, f"Invalid JSON: {record}"
+    try:
+        item = schema.model_validate(record)
+    except ValidationError as exc:
+        return None, "; ".join(
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()
+        )
+    if isinstance(item, AvailabilityImport) and item.doctor_email is None and item.doctor_id is None:
+        return None, "doctor_email or doctor_id is required"
+    return item, None
+
+def claim_emails(db: Session, batch: List[Tuple[int, BaseModel]], errors: Dict[int, str]) -> List[Tuple[int, BaseModel]]:
+    # Emails are unique across doctors and patients, within the file as well as the database
+    taken = {
+        row.email for row in db.query(Account.email).filter(
+            Account.email.in_({item.email for _, item in batch})
+        )
+    }
+    accepted = []
+    for number, item in batch:
+        if item.email in taken:
+            errors[number] = EMAIL_TAKEN
+            continue
+        taken.add(item.email)
+        accepted.append((number, item))
+    return accepted
+
+def hash_passwords(executor: HashingExecutor, batch: List[Tuple[int, BaseModel]]) -> List[str]:
+    futures = [executor.submit(get_password_hash, item.password) for _, item in batch]
+    return [future.result() for future in futures]
+
+def import_doctors(db: Session, batch, executor: HashingExecutor, errors: Dict[int, str]) -> int:
+    batch = claim_emails(db, batch, errors)
+    for (_, item), hashed_password in zip(batch, hash_passwords(executor, batch)):
+        doctor = Doctor(
+            email=item.email,
+            hashed_password=hashed_password,
+            full_name=item.full_name,
+            specialization=item.specialization,
+            phone_number=item.phone_number
+        )
+        doctor.work_experiences = [WorkExperience(**exp.model_dump()) for exp in item.work_experiences or []]
+        doctor.academic_histories = [AcademicHistory(**history.model_dump()) for history in item.academic_histories or []]
+        db.add(doctor)
+    return len(batch)
+
+def import_patients(db: Session, batch, executor: HashingExecutor, errors: Dict[int, str]) -> int:
+    batch = claim_emails(db, batch, errors)
+    db.add_all([
+        Patient(
+            email=item.email,
+            hashed_password=hashed_password,
+            full_name=item.full_name,
+            date_of_birth=item.date_of_birth,
+            phone_number=item.phone_number,
+            address=item.address
+        )
+        for (_, item), hashed_password in zip(batch, hash_passwords(executor, batch))
+    ])
+    return len(batch)
+
+def import_availabilities(db: Session, batch, executor: HashingExecutor, errors: Dict[int, str]) -> int:
+    # Resolve doctors for the whole batch with one query
+    emails = {item.doctor_email for _, item in batch if item.doctor_id is None}
+    ids = {item.doctor_id for _, item in batch if item.doctor_id is not None}
+    by_email = dict(db.query(Doctor.email, Doctor.id).filter(Doctor.email.in_(emails)).all()) if emails else {}
+    known_ids = {row.id for row in db.query(Doctor.id).filter(Doctor.id.in_(ids))} if ids else set()
+    doctor_ids = known_ids | set(by_email.values())
+
+    # Existing windows make a re-run after an interrupted batch idempotent
+    existing: Set[tuple] = {
+        (row.doctor_id, row.day_of_week, row.start_time, row.end_time)
+        for row in db.query(
+            Availability.doctor_id, Availability.day_of_week, Availability.start_time, Availability.end_time
+        ).filter(Availability.doctor_id.in_(doctor_ids))
+    }
+    imported = 0
+    for number, item in batch:
+        doctor_id = item.doctor_id if item.doctor_id is not None else by_email.get(item.doctor_email)
+        if doctor_id not in doctor_ids:
+            errors[number] = DOCTOR_NOT_FOUND
+            continue
+        key = (doctor_id, item.day_of_week, item.start_time, item.end_time)
+        if key in existing:
+            errors[number] = DUPLICATE_AVAILABILITY
+            continue
+        existing.add(key)
+        db.add(Availability(
+            doctor_id=doctor_id,
+            day_of_week=item.day_of_week,
+            start_time=item.start_time,
+            end_time=item.end_time,
+            is_active=True
+        ))
+        imported += 1
+    return imported
+
+IMPORTERS = {
+    "doctors": import_doctors,
+    "patients": import_patients,
+    "availabilities": import_availabilities,
+}
+
+class Checkpoint:
+    """Number of input rows already handled, stored next to the input file."""
+
+    def __init__(self, path: str, kind: str, source: str):
+        self.path = path
+        self.kind = kind
+        self.source = os.path.abspath(source)
+        self.rows = 0
+        self.imported = 0
+        self.failed = 0
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path) as f:
+            state = json.load(f)
+        if state.get("kind") != self.kind or state.get("source") != self.source:
+            raise SystemExit(f"Checkpoint {self.path} belongs to another import; use --restart to discard it")
+        self.rows, self.imported, self.failed = state["rows"], state["imported"], state["failed"]
+
+    def save(self):
+        # Write-then-rename so a crash never leaves a half-written checkpoint
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({
+                "kind": self.kind, "source": self.source,
+                "rows": self.rows, "imported": self.imported, "failed": self.failed,
+            }, f)
+        os.replace(tmp, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+def run_import(
+    kind: str,
+    path: str,
+    file_format: str,
+    batch_size: int,
+    executor: HashingExecutor,
+    checkpoint: Checkpoint,
+    errors_path: str
+) -> Checkpoint:
+    schema, importer = SCHEMAS[kind], IMPORTERS[kind]
+    records = read_records(path, file_format)
+
+    # Skip rows committed by a previous run
+    for _ in range(checkpoint.rows):
+        next(records, None)
+
+    number = checkpoint.rows
+    with open(errors_path, "a") as errors_file:
+        while True:
+            batch, errors = [], {}
+            for record in records:
+                number += 1
+                item, error = validate(schema, record)
+                if error:
+                    errors[number] = error
+                else:
+                    batch.append((number, item))
+                if number - checkpoint.rows >= batch_size:
+                    break
+            if number == checkpoint.rows:
+                return checkpoint
+
+            with SessionLocal() as db:
+                imported = importer(db, batch, executor, errors) if batch else 0
+                db.commit()
+
+            for row, error in sorted(errors.items()):
+                errors_file.write(json.dumps({"row": row, "error": error}) + "\n")
+            errors_file.flush()
+            checkpoint.rows = number
+            checkpoint.imported += imported
+            checkpoint.failed += len(errors)
+            checkpoint.save()
+            print(
+                f"{kind}: {checkpoint.rows} rows, {checkpoint.imported} imported, {checkpoint.failed} rejected",
+                file=sys.stderr
+            )
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("kind", choices=sorted(SCHEMAS))
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=("csv", "ndjson"), help="Defaults to the file extension")
+    parser.add_argument("--batch-size", type=int, default=500, help="Rows per transaction")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Password hashing processes")
+    parser.add_argument("--checkpoint", help="Defaults to <path>.checkpoint")
+    parser.add_argument("--errors", help="Defaults to <path>.errors.ndjson")
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint")
+    args = parser.parse_args(argv)
+
+    file_format = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+    checkpoint = Checkpoint(args.checkpoint or args.path + ".checkpoint", args.kind, args.path)
+    errors_path = args.errors or args.path + ".errors.ndjson"
+    if args.restart:
+        checkpoint.clear()
+        if os.path.exists(errors_path):
+            os.remove(errors_path)
+    checkpoint.load()
+    if checkpoint.rows:
+        print(f"Resuming after row {checkpoint.rows}", file=sys.stderr)
+
+    executor = HashingExecutor(max_workers=args.workers, max_pending=max(args.batch_size, settings.HASHING_MAX_PENDING))
+    started = time.perf_counter()
+    try:
+        run_import(args.kind, args.path, file_format, args.batch_size, executor, checkpoint, errors_path)
+    finally:
+        executor.shutdown()
+    elapsed = time.perf_counter() - started
+    print(json.dumps({
+        "kind": args.kind,
+        "rows": checkpoint.rows,
+        "imported": checkpoint.imported,
+        "rejected": checkpoint.failed,
+        "seconds": round(elapsed, 3),
+    }))
+
+if __name__ == "__main__":
+    main()
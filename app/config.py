@@ -6,14 +6,63 @@ class Settings(BaseSettings):
     PROJECT_NAME: str = "FastAPI Appointment System"
     API_V1_STR: str = "/api/v1"
     
+    # "production" skips the startup check that the database is at the Alembic head
+    ENVIRONMENT: str = os.getenv("ENVIRONMENT", "development")
+    
     # Database settings
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./app.db")
+    # Storage profile from app.database.STORAGE_PROFILES: SQLite pragmas
+    # (journal mode, synchronous, mmap, cache, busy timeout) and pool sizing
+    # for server databases
+    DATABASE_PROFILE: str = "default"
+    # Serve the API from async routers backed by an AsyncSession
+    ASYNC_DB_ENABLED: bool = False
+    # Defaults to DATABASE_URL with the matching async driver (aiosqlite/asyncpg)
+    ASYNC_DATABASE_URL: Optional[str] = os.getenv("ASYNC_DATABASE_URL")
     
     # Security settings
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # Password hashing pool (0 workers hashes inline on the request thread)
+    HASHING_WORKERS: int = max(1, (os.cpu_count() or 2) // 2)
+    HASHING_MAX_PENDING: int = 64
+    
+    # In-process cache of verified tokens and their doctor/patient rows (0 disables)
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+    
+    # Cached public availability lists, invalidated on every availability write (0 disables)
+    AVAILABILITY_CACHE_TTL_SECONDS: int = 300
+    AVAILABILITY_CACHE_MAX_ENTRIES: int = 10000
+    
+    # Per-doctor slot bitmaps (weekly schedule and booked slots per date), kept up
+    # to date by this worker's writes; other workers' writes show after the TTL (0 disables)
+    SCHEDULE_CACHE_TTL_SECONDS: int = 300
+    SCHEDULE_CACHE_MAX_ENTRIES: int = 10000
+    
+    # Rendered iCalendar feeds per doctor, patched in place by this worker's
+    # appointment writes; other workers' writes show after the TTL (0 disables)
+    CALENDAR_CACHE_TTL_SECONDS: int = 300
+    CALENDAR_CACHE_MAX_ENTRIES: int = 10000
+    
+    # Rows fetched per round trip by the streaming appointment exports
+    EXPORT_BATCH_SIZE: int = 1000
+    
+    # Per-route request and SQL metrics, served in Prometheus format at /metrics
+    METRICS_ENABLED: bool = False
+    # Hit/miss counters of this worker's in-process caches as JSON at /cache/stats
+    CACHE_STATS_ENABLED: bool = False
+    
+    # Development profiler: logs each request's SQL with call sites, flags
+    # statements repeated PROFILER_REPEAT_THRESHOLD times (probable N+1) and
+    # requests over the statement or SQL time budget
+    PROFILER_ENABLED: bool = False
+    PROFILER_MAX_STATEMENTS: int = 20
+    PROFILER_MAX_DB_MS: int = 100
+    PROFILER_REPEAT_THRESHOLD: int = 5
+    
     # Default admin user
     FIRST_SUPERUSER: Optional[str] = os.getenv("FIRST_SUPERUSER")
     FIRST_SUPERUSER_PASSWORD: Optional[str] = os.getenv("FIRST_SUPERUSER_PASSWORD")
@@ -0,0 +1,63 @@
+from typing import Optional, Union
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.config import settings
+from app.core.cache import TTLCache
+from app.core.pending import queue_change, take_changes
+from app.models.doctor import Doctor
+from app.models.patient import Patient
+
+# token -> JWT subject ("D<id>" / "P<id>") for tokens that already passed verification
+token_cache = TTLCache(
+    maxsize=settings.AUTH_CACHE_MAX_ENTRIES, ttl=settings.AUTH_CACHE_TTL_SECONDS
+)
+# subject -> detached snapshot of the Doctor/Patient row
+principal_cache = TTLCache(
+    maxsize=settings.AUTH_CACHE_MAX_ENTRIES, ttl=settings.AUTH_CACHE_TTL_SECONDS
+)
+
+def principal_subject(user: Union[Doctor, Patient]) -> str:
+    return f"{'D' if isinstance(user, Doctor) else 'P'}{user.id}"
+
+def get_cached_principal(subject: str) -> Optional[Union[Doctor, Patient]]:
+    # Callers must merge the snapshot into their session (merge(load=False)) rather than use it directly
+    return principal_cache.get(subject)
+
+def cache_principal(user: Union[Doctor, Patient]):
+    if not principal_cache.enabled:
+        return
+    # The row version is left out: a merged snapshot then reads the current
+    # version when it is written, instead of failing the version check for
+    # the rest of the TTL after another worker updated the row
+    mapper = inspect(user).mapper
+    snapshot = mapper.class_(**{
+        attr.key: getattr(user, attr.key)
+        for attr in mapper.column_attrs
+        if mapper.version_id_col is None or attr.columns[0] is not mapper.version_id_col
+    })
+    make_transient_to_detached(snapshot)
+    principal_cache.set(principal_subject(user), snapshot)
+
+def invalidate_principal(user: Union[Doctor, Patient, str]):
+    principal_cache.pop(user if isinstance(user, str) else principal_subject(user))
+
+# Any UPDATE of a doctor or patient row (profile edits, password changes,
+# deactivation) drops its snapshot, and again once the transaction commits so
+# a request that read the old row in between cannot leave it cached.
+@event.listens_for(Doctor, "after_update")
+@event.listens_for(Patient, "after_update")
+@event.listens_for(Doctor, "after_delete")
+@event.listens_for(Patient, "after_delete")
+def _invalidate_on_write(mapper, connection, target):
+    subject = principal_subject(target)
+    invalidate_principal(subject)
+    session = Session.object_session(target)
+    if session is not None:
+        queue_change(session, "invalidated_principals", subject)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    for subject in set(take_changes(session, "invalidated_principals")):
+        invalidate_principal(subject)
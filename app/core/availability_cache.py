@@ -0,0 +1,71 @@
+import threading
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.cache import TTLCache
+from app.core.pending import queue_change, take_changes
+from app.core.etag import make_etag
+from app.core.fast_json import dumps
+from app.models.availability import Availability
+from app.models.doctor import Doctor
+from app.schemas.availability import Availability as AvailabilitySchema
+
+# doctor id -> (ETag, serialized JSON body) of GET /availabilities/doctor/{doctor_id}
+availability_cache = TTLCache(
+    maxsize=settings.AVAILABILITY_CACHE_MAX_ENTRIES, ttl=settings.AVAILABILITY_CACHE_TTL_SECONDS
+)
+
+# Bumped on every invalidation so a read that raced with a write does not
+# store the list it loaded before the write
+_generation = 0
+_generation_lock = threading.Lock()
+
+def current_generation() -> int:
+    return _generation
+
+def serialize_availabilities(availabilities: Iterable[Availability]) -> Tuple[str, bytes]:
+    availabilities = list(availabilities)
+    etag = make_etag(
+        "availabilities", [(availability.id, availability.version) for availability in availabilities]
+    )
+    body = dumps([
+        AvailabilitySchema.model_validate(availability).model_dump(mode="json")
+        for availability in availabilities
+    ])
+    return etag, body
+
+def get_cached_availabilities(doctor_id: int) -> Optional[Tuple[str, bytes]]:
+    return availability_cache.get(doctor_id)
+
+def cache_availabilities(doctor_id: int, entry: Tuple[str, bytes], generation: int):
+    with _generation_lock:
+        if generation == _generation:
+            availability_cache.set(doctor_id, entry)
+
+def invalidate_availabilities(doctor_id: int):
+    global _generation
+    with _generation_lock:
+        _generation += 1
+        availability_cache.pop(doctor_id)
+
+# Creating, editing or deleting an availability drops the doctor's cached list
+# immediately and again after commit, so readers in between cannot re-cache
+# the old schedule.
+@event.listens_for(Availability, "after_insert")
+@event.listens_for(Availability, "after_update")
+@event.listens_for(Availability, "after_delete")
+@event.listens_for(Doctor, "after_delete")
+def _invalidate_on_write(mapper, connection, target):
+    doctor_id = target.id if isinstance(target, Doctor) else target.doctor_id
+    invalidate_availabilities(doctor_id)
+    session = Session.object_session(target)
+    if session is not None:
+        queue_change(session, "invalidated_availabilities", doctor_id)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    for doctor_id in set(take_changes(session, "invalidated_availabilities")):
+        invalidate_availabilities(doctor_id)
@@ -0,0 +1,100 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.slots import WeeklySchedule, slot_start
+from app.models.appointment import Appointment, AppointmentStatus
+
+DOCTOR_NOT_FOUND = "Doctor not found"
+DOCTOR_NOT_AVAILABLE = "Doctor is not available at this time"
+SLOT_TAKEN = "Time slot is already booked"
+
+def validate_batch(
+    requests: List[Tuple[int, datetime]],
+    existing_doctor_ids: Set[int],
+    availabilities: Iterable,
+    booked: Iterable[Tuple[int, datetime]]
+) -> List[Optional[str]]:
+    """Validate (doctor_id, appointment_datetime) pairs against preloaded rows.
+
+    `booked` holds (doctor_id, slot_start) of active appointments. Applies the
+    same rules as single bookings for each request in order, treating requests
+    accepted earlier in the batch as booked. Returns an error message per
+    request, or None when it can be booked.
+    """
+    by_doctor: Dict[int, list] = defaultdict(list)
+    for availability in availabilities:
+        by_doctor[availability.doctor_id].append(availability)
+    schedules = {doctor_id: WeeklySchedule(rows) for doctor_id, rows in by_doctor.items()}
+
+    taken: Set[Tuple[int, datetime]] = set(booked)
+
+    errors: List[Optional[str]] = []
+    for doctor_id, appointment_datetime in requests:
+        if doctor_id not in existing_doctor_ids:
+            errors.append(DOCTOR_NOT_FOUND)
+            continue
+
+        schedule = schedules.get(doctor_id)
+        if schedule is None or not schedule.is_available(appointment_datetime):
+            errors.append(DOCTOR_NOT_AVAILABLE)
+            continue
+
+        key = (doctor_id, slot_start(appointment_datetime))
+        if key in taken:
+            errors.append(SLOT_TAKEN)
+            continue
+
+        taken.add(key)
+        errors.append(None)
+    return errors
+
+def insert_batch(
+    db: Session,
+    patient_id: int,
+    items: list,
+    requests: List[Tuple[int, datetime]],
+    errors: List[Optional[str]]
+) -> Dict[int, Appointment]:
+    """Insert the batch items that passed validation, by index.
+
+    All of them are written in one SAVEPOINT. If the slot index rejects that
+    (a booking committed since the batch was validated), each item is retried
+    in its own SAVEPOINT. Items that still conflict get SLOT_TAKEN in `errors`,
+    and the rest of the batch is kept.
+    """
+    def build(index: int) -> Appointment:
+        item = items[index]
+        return Appointment(
+            doctor_id=item.doctor_id,
+            patient_id=patient_id,
+            appointment_datetime=requests[index][1],
+            reason=item.reason,
+            notes=item.notes,
+            status=AppointmentStatus.PENDING
+        )
+
+    indexes = [index for index, error in enumerate(errors) if error is None]
+    try:
+        with db.begin_nested():
+            created = {index: build(index) for index in indexes}
+            db.add_all(created.values())
+        return created
+    except IntegrityError:
+        pass
+
+    # Rolled-back objects keep their assigned ids, so each retry gets a new one
+    created = {}
+    for index in indexes:
+        appointment = build(index)
+        try:
+            with db.begin_nested():
+                db.add(appointment)
+        except IntegrityError:
+            errors[index] = SLOT_TAKEN
+            continue
+        created[index] = appointment
+    return created
@@ -0,0 +1,268 @@
+"""iCalendar feeds of each doctor's upcoming appointments.
+
+A doctor's calendar app subscribes to /calendar/{token}.ics and polls it.
+Each upcoming appointment is rendered to a VEVENT once, and the feed is the
+doctor's cached events joined together. Mapper events queue the new event
+of each appointment row written in the session. After commit, that one
+event is replaced in the cached feed instead of rebuilding it. Writes from
+other workers show up once the feed expires.
+
+The feed's ETag is built from the (id, version) pairs of its events. It is
+weak because DTSTAMP records when this worker rendered the event, so two
+workers can serve different bytes for the same appointments.
+"""
+import secrets
+import threading
+from collections import defaultdict
+from datetime import datetime, time, timezone
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.cache import TTLCache
+from app.core.pending import queue_change, take_changes
+from app.core.etag import make_etag
+from app.core.slots import SLOT_DURATION
+from app.models.appointment import Appointment, AppointmentStatus, ACTIVE_STATUSES
+from app.models.doctor import Doctor
+
+# calendar token -> doctor id
+calendar_token_cache = TTLCache(
+    maxsize=settings.CALENDAR_CACHE_MAX_ENTRIES, ttl=settings.CALENDAR_CACHE_TTL_SECONDS
+)
+# doctor id -> CalendarFeed of their upcoming appointments
+calendar_cache = TTLCache(
+    maxsize=settings.CALENDAR_CACHE_MAX_ENTRIES, ttl=settings.CALENDAR_CACHE_TTL_SECONDS
+)
+
+# Bumped per doctor whenever a commit changes their feed (and on every token
+# change), so a load that raced with the commit does not store what it read
+_generations: Dict[int, int] = defaultdict(int)
+_token_generation = 0
+_lock = threading.Lock()
+
+PRODID = f"-//{settings.PROJECT_NAME}//Doctor Calendar//EN"
+# Right-hand side of the events' UIDs, which must stay stable across renders
+UID_DOMAIN = settings.PROJECT_NAME.lower().replace(" ", "-")
+# How often subscribed clients are asked to poll
+REFRESH_INTERVAL = "PT15M"
+
+class CalendarEvent(NamedTuple):
+    appointment_id: int
+    version: int
+    start: datetime
+    text: str
+
+def new_calendar_token() -> str:
+    return secrets.token_urlsafe(32)
+
+def _escape(value: str) -> str:
+    # TEXT values (RFC 5545 3.3.11)
+    return (
+        value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+        .replace("\r\n", "\\n").replace("\n", "\\n")
+    )
+
+def _fold(line: str) -> str:
+    # Content lines are at most 75 octets; longer ones continue on lines that
+    # start with a space (RFC 5545 3.1), never splitting a UTF-8 character
+    chunks, current, size, limit = [], [], 0, 75
+    for char in line:
+        width = len(char.encode())
+        if size + width > limit:
+            chunks.append("".join(current))
+            current, size, limit = [], 0, 74
+        current.append(char)
+        size += width
+    chunks.append("".join(current))
+    return "\r\n ".join(chunks)
+
+def _lines(lines: Iterable[str]) -> str:
+    return "".join(_fold(line) + "\r\n" for line in lines)
+
+def _local_time(value: datetime) -> str:
+    # Appointment times are naive local times, so they are written as floating times
+    return value.strftime("%Y%m%dT%H%M%S")
+
+def render_event(appointment, stamp: datetime) -> Optional[CalendarEvent]:
+    # None for appointments that no longer hold the slot (cancelled, completed)
+    if appointment.status not in ACTIVE_STATUSES:
+        return None
+    start = appointment.appointment_datetime
+    summary = f"Appointment: {appointment.reason}" if appointment.reason else "Appointment"
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:appointment-{appointment.id}@{UID_DOMAIN}",
+        f"DTSTAMP:{stamp.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}",
+        f"DTSTART:{_local_time(start)}",
+        f"DTEND:{_local_time(start + SLOT_DURATION)}",
+        f"SEQUENCE:{appointment.version - 1}",
+        f"STATUS:{'TENTATIVE' if appointment.status == AppointmentStatus.PENDING else 'CONFIRMED'}",
+        f"SUMMARY:{_escape(summary)}",
+    ]
+    if appointment.notes:
+        lines.append(f"DESCRIPTION:{_escape(appointment.notes)}")
+    lines.append("END:VEVENT")
+    return CalendarEvent(appointment.id, appointment.version, start, _lines(lines))
+
+class CalendarFeed:
+    """A doctor's rendered events by appointment id, and the feed last assembled from them."""
+
+    __slots__ = ("name", "events", "last_modified", "_rendered")
+
+    def __init__(self, name: str, events: Iterable[CalendarEvent], built_at: datetime):
+        self.name = name
+        self.events: Dict[int, CalendarEvent] = {event.appointment_id: event for event in events}
+        self.last_modified = built_at
+        self._rendered: Optional[Tuple[datetime, str, bytes]] = None
+
+    def set_event(self, appointment_id: int, event: Optional[CalendarEvent], changed_at: datetime):
+        if event is None:
+            self.events.pop(appointment_id, None)
+        else:
+            self.events[appointment_id] = event
+        self.last_modified = changed_at
+        self._rendered = None
+
+    def render(self, cutoff: datetime, now: datetime) -> Tuple[str, bytes]:
+        # (ETag, body) of the events starting at or after cutoff; reassembled
+        # only after a change or when the cutoff moves on
+        if self._rendered is not None and self._rendered[0] == cutoff:
+            return self._rendered[1], self._rendered[2]
+        upcoming = {key: event for key, event in self.events.items() if event.start >= cutoff}
+        if len(upcoming) < len(self.events):
+            self.events = upcoming
+            self.last_modified = now
+        ordered = sorted(upcoming.values(), key=lambda event: (event.start, event.appointment_id))
+        etag = "W/" + make_etag("calendar", [(event.appointment_id, event.version) for event in ordered], self.name)
+        body = "".join([
+            _lines([
+                "BEGIN:VCALENDAR",
+                "VERSION:2.0",
+                f"PRODID:{PRODID}",
+                "CALSCALE:GREGORIAN",
+                "METHOD:PUBLISH",
+                f"X-WR-CALNAME:{_escape(self.name)}",
+                f"REFRESH-INTERVAL;VALUE=DURATION:{REFRESH_INTERVAL}",
+                f"X-PUBLISHED-TTL:{REFRESH_INTERVAL}",
+            ]),
+            *(event.text for event in ordered),
+            "END:VCALENDAR\r\n",
+        ]).encode()
+        self._rendered = (cutoff, etag, body)
+        return etag, body
+
+def _calendar_doctor(db: Session, token: str) -> Optional[int]:
+    doctor_id = calendar_token_cache.get(token)
+    if doctor_id is not None:
+        return doctor_id
+    generation = _token_generation
+    doctor_id = db.query(Doctor.id).filter(Doctor.calendar_token == token, Doctor.is_active == True).scalar()
+    if doctor_id is not None:
+        with _lock:
+            if generation == _token_generation:
+                calendar_token_cache.set(token, doctor_id)
+    return doctor_id
+
+def _load_feed(db: Session, doctor_id: int, cutoff: datetime) -> CalendarFeed:
+    generation = _generations[doctor_id]
+    name = db.query(Doctor.full_name).filter(Doctor.id == doctor_id).scalar()
+    appointments = db.query(
+        Appointment.id,
+        Appointment.appointment_datetime,
+        Appointment.status,
+        Appointment.reason,
+        Appointment.notes,
+        Appointment.version
+    ).filter(
+        Appointment.doctor_id == doctor_id,
+        Appointment.appointment_datetime >= cutoff,
+        Appointment.status.in_(ACTIVE_STATUSES)
+    )
+    stamp = datetime.now(timezone.utc)
+    feed = CalendarFeed(name, (render_event(row, stamp) for row in appointments), stamp)
+    with _lock:
+        if generation == _generations[doctor_id]:
+            calendar_cache.set(doctor_id, feed)
+    return feed
+
+def _render(feed: CalendarFeed) -> Tuple[str, bytes, datetime]:
+    # Upcoming means from the start of today, so today's earlier appointments stay listed
+    now = datetime.now()
+    with _lock:
+        etag, body = feed.render(datetime.combine(now.date(), time.min), datetime.now(timezone.utc))
+        return etag, body, feed.last_modified
+
+def cached_calendar(token: str) -> Optional[Tuple[str, bytes, datetime]]:
+    """(ETag, body, Last-Modified) of the token's feed if it is cached, else None."""
+    doctor_id = calendar_token_cache.get(token)
+    feed = calendar_cache.get(doctor_id) if doctor_id is not None else None
+    return _render(feed) if feed is not None else None
+
+def get_calendar(db: Session, token: str) -> Optional[Tuple[str, bytes, datetime]]:
+    """(ETag, body, Last-Modified) of the token's feed, or None for an unknown token."""
+    doctor_id = _calendar_doctor(db, token)
+    if doctor_id is None:
+        return None
+    feed = calendar_cache.get(doctor_id)
+    if feed is None:
+        feed = _load_feed(db, doctor_id, datetime.combine(datetime.now().date(), time.min))
+    return _render(feed)
+
+def _queue(target, change: tuple):
+    session = Session.object_session(target)
+    if session is not None:
+        queue_change(session, "calendar_changes", change)
+
+@event.listens_for(Appointment, "after_insert")
+@event.listens_for(Appointment, "after_update")
+def _appointment_written(mapper, connection, target):
+    history = inspect(target).attrs.doctor_id.history
+    if history.deleted and history.deleted[0] is not None:
+        _queue(target, ("event", history.deleted[0], target.id, None))
+    _queue(target, ("event", target.doctor_id, target.id, render_event(target, datetime.now(timezone.utc))))
+
+@event.listens_for(Appointment, "after_delete")
+def _appointment_deleted(mapper, connection, target):
+    _queue(target, ("event", target.doctor_id, target.id, None))
+
+@event.listens_for(Doctor, "after_update")
+def _doctor_updated(mapper, connection, target):
+    state = inspect(target)
+    token = state.attrs.calendar_token.history
+    if token.deleted and token.deleted[0] is not None:
+        _queue(target, ("token", token.deleted[0]))
+    if state.attrs.full_name.history.has_changes() or state.attrs.is_active.history.has_changes():
+        # The name titles the feed; a deactivated doctor's token stops resolving
+        _queue(target, ("drop", target.id))
+        if target.calendar_token is not None:
+            _queue(target, ("token", target.calendar_token))
+
+@event.listens_for(Doctor, "after_delete")
+def _doctor_deleted(mapper, connection, target):
+    _queue(target, ("drop", target.id))
+    if target.calendar_token is not None:
+        _queue(target, ("token", target.calendar_token))
+
+@event.listens_for(Session, "after_commit")
+def _apply_after_commit(session):
+    global _token_generation
+    changes = take_changes(session, "calendar_changes")
+    if not changes:
+        return
+    changed_at = datetime.now(timezone.utc)
+    with _lock:
+        for kind, key, *change in changes:
+            if kind == "token":
+                _token_generation += 1
+                calendar_token_cache.pop(key)
+                continue
+            _generations[key] += 1
+            if kind == "event":
+                feed = calendar_cache.peek(key)
+                if feed is not None:
+                    feed.set_event(*change, changed_at)
+            else:
+                calendar_cache.pop(key)
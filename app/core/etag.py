@@ -0,0 +1,52 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable, Optional, Tuple
+
+from fastapi import Request, Response, status
+
+def make_etag(kind: str, versions: Iterable[Tuple[int, int]], *extra) -> str:
+    """Strong ETag for a representation built from rows with the given (id, version) pairs.
+
+    `kind` names the representation and `extra` carries anything else that
+    shapes the body or headers (e.g. the page size), so equal tags always mean
+    identical responses.
+    """
+    digest = hashlib.sha1(repr((kind, [tuple(row) for row in versions], extra)).encode())
+    return f'"{digest.hexdigest()}"'
+
+def if_none_match(request: Request) -> Optional[str]:
+    return request.headers.get("if-none-match")
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    # If-None-Match uses weak comparison, so W/"x" matches "x" and the reverse
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in header.split(",")]
+    return any(tag.removeprefix("W/") == etag.removeprefix("W/") for tag in candidates)
+
+def http_date(value: datetime) -> str:
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+def if_modified_since(request: Request) -> Optional[datetime]:
+    header = request.headers.get("if-modified-since")
+    if not header:
+        return None
+    try:
+        value = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return None
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+def is_not_modified(request: Request, etag: str, last_modified: datetime) -> bool:
+    # If-Modified-Since only counts when the client sent no If-None-Match (RFC 9110 13.2.2)
+    header = if_none_match(request)
+    if header is not None:
+        return etag_matches(header, etag)
+    since = if_modified_since(request)
+    return since is not None and last_modified.replace(microsecond=0) <= since
+
+def not_modified(etag: str, headers: Optional[dict] = None) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, **(headers or {})})
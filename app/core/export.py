@@ -0,0 +1,114 @@
+import csv
+import io
+import json
+from typing import AsyncIterator, Iterable, Iterator, Literal, Sequence
+
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Session
+
+from app import database
+from app.config import settings
+from app.database import SessionLocal
+from app.models.appointment import Appointment
+
+ExportFormat = Literal["ndjson", "csv"]
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+# Plain columns, not ORM objects: nothing accumulates in the identity map
+EXPORT_COLUMNS = (
+    Appointment.id,
+    Appointment.doctor_id,
+    Appointment.patient_id,
+    Appointment.appointment_datetime,
+    Appointment.status,
+    Appointment.reason,
+    Appointment.notes,
+)
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+
+def export_query(*criteria) -> Select:
+    # Oldest first; served by the (doctor_id|patient_id, appointment_datetime) indexes
+    return (
+        select(*EXPORT_COLUMNS)
+        .where(*criteria)
+        .order_by(Appointment.appointment_datetime, Appointment.id)
+        .execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+    )
+
+def export_filename(owner: str, owner_id: int, export_format: str) -> str:
+    return f"appointments-{owner}-{owner_id}.{export_format}"
+
+def _cell(value):
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+def encode_rows(rows: Sequence[Sequence], export_format: str) -> str:
+    # One chunk of output per batch of rows
+    if export_format == "csv":
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows([[_cell(value) for value in row] for row in rows])
+        return buffer.getvalue()
+    return "".join(
+        json.dumps(dict(zip(EXPORT_FIELDS, [_cell(value) for value in row]))) + "\n" for row in rows
+    )
+
+def encode_header(export_format: str) -> str:
+    return encode_rows([EXPORT_FIELDS], "csv") if export_format == "csv" else ""
+
+def _chunks(partitions: Iterable[Sequence], export_format: str) -> Iterator[bytes]:
+    header = encode_header(export_format)
+    if header:
+        yield header.encode()
+    for rows in partitions:
+        yield encode_rows(rows, export_format).encode()
+
+def _open_profile(db: Session, label: str):
+    if settings.PROFILER_ENABLED:
+        from app.core.profiler import start_profile
+
+        start_profile(db, label)
+
+def _close_profile(db: Session):
+    if settings.PROFILER_ENABLED:
+        from app.core.profiler import finish_profile
+
+        finish_profile(db)
+
+def stream_appointments(export_format: str, label: str, *criteria) -> Iterator[bytes]:
+    """Yield the export in chunks of EXPORT_BATCH_SIZE rows.
+
+    Rows are fetched with yield_per (a server-side cursor where the driver
+    supports it), so memory stays flat however long the history is. The
+    response body is produced after the endpoint returns, when the request's
+    session may already be closed, so the stream opens and closes a session of
+    its own; `label` names it in the SQL profiler.
+    """
+    db = SessionLocal()
+    _open_profile(db, label)
+    try:
+        result = db.execute(export_query(*criteria))
+        try:
+            yield from _chunks(result.partitions(), export_format)
+        finally:
+            result.close()
+    finally:
+        db.close()
+        _close_profile(db)
+
+async def stream_appointments_async(export_format: str, label: str, *criteria) -> AsyncIterator[bytes]:
+    header = encode_header(export_format)
+    if header:
+        yield header.encode()
+    async with database.AsyncSessionLocal() as db:
+        _open_profile(db.sync_session, label)
+        try:
+            result = await db.stream(export_query(*criteria))
+            try:
+                async for rows in result.partitions():
+                    yield encode_rows(rows, export_format).encode()
+            finally:
+                await result.close()
+        finally:
+            _close_profile(db.sync_session)
@@ -0,0 +1,49 @@
+"""Fast response path for list endpoints.
+
+List endpoints read plain column tuples instead of ORM objects and turn them
+into dicts shaped like the response schema. The dicts are encoded with orjson
+when it is installed, and returned as a Response so FastAPI does not validate
+and re-encode them. The route keeps its response_model for the OpenAPI docs.
+"""
+import json
+from datetime import date, datetime, time
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Sequence, Type
+
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # falls back to the stdlib encoder
+    orjson = None
+
+def _default(value: Any):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(content: Any) -> bytes:
+    # Same output as Pydantic's JSON mode for the types our schemas use
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def schema_columns(schema: Type[BaseModel], model) -> list:
+    # Model columns for the schema's fields, in field order; nested lists are
+    # filled in separately
+    columns = model.__table__.columns
+    return [getattr(model, name) for name in schema.model_fields if name in columns]
+
+def rows_to_dicts(rows: Iterable[Sequence], columns: list) -> List[Dict[str, Any]]:
+    # Rows may carry extra trailing columns (e.g. version for the ETag), which zip drops
+    names = [column.key for column in columns]
+    return [dict(zip(names, row)) for row in rows]
@@ -0,0 +1,131 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict
+
+from app.config import settings
+from app.core.security import get_password_hash, verify_password
+
+class HashingQueueFullError(RuntimeError):
+    pass
+
+class HashingExecutor:
+    """Bounded process pool for bcrypt work.
+
+    Hashing runs in separate processes so it neither holds the GIL nor ties up
+    the event loop; at most `max_pending` jobs may be queued or running at once
+    and further submissions are rejected with HashingQueueFullError.
+    `max_workers=0` runs jobs inline in the calling thread.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.total_seconds = 0.0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._pool
+
+    def _reset_pool(self, broken: ProcessPoolExecutor):
+        with self._pool_lock:
+            if self._pool is broken:
+                self._pool = None
+        broken.shutdown(wait=False)
+
+    def _finished(self, future: Future, started: float):
+        with self._lock:
+            self._pending -= 1
+            self.total_seconds += time.perf_counter() - started
+            if future.exception() is None:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+    def submit(self, fn: Callable, *args) -> Future:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise HashingQueueFullError("Too many password hashing jobs in progress")
+            self._pending += 1
+            self.submitted += 1
+        started = time.perf_counter()
+
+        if self.max_workers == 0:
+            future = Future()
+            try:
+                future.set_result(fn(*args))
+            except Exception as exc:
+                future.set_exception(exc)
+            self._finished(future, started)
+            return future
+
+        try:
+            pool = self._get_pool()
+            try:
+                future = pool.submit(fn, *args)
+            except BrokenProcessPool:
+                # A worker died; replace the pool once and retry
+                self._reset_pool(pool)
+                future = self._get_pool().submit(fn, *args)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+                self.failed += 1
+            raise
+        future.add_done_callback(lambda done: self._finished(done, started))
+        return future
+
+    def run(self, fn: Callable, *args):
+        return self.submit(fn, *args).result()
+
+    async def run_async(self, fn: Callable, *args):
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def hash(self, password: str) -> str:
+        return self.run(get_password_hash, password)
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return self.run(verify_password, plain_password, hashed_password)
+
+    async def hash_async(self, password: str) -> str:
+        return await self.run_async(get_password_hash, password)
+
+    async def verify_async(self, plain_password: str, hashed_password: str) -> bool:
+        return await self.run_async(verify_password, plain_password, hashed_password)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "total_seconds": self.total_seconds,
+            }
+
+    def shutdown(self):
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+hashing_executor = HashingExecutor(
+    max_workers=settings.HASHING_WORKERS,
+    max_pending=settings.HASHING_MAX_PENDING
+)
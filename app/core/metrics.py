@@ -0,0 +1,215 @@
+"""In-process request and database metrics in Prometheus text format.
+
+MetricsMiddleware records per-route request counts, latency and the number of
+requests in flight. instrument_engine() hooks the engine's cursor events to
+time each SQL statement. Statements run while a request is being handled are
+also added to that request's totals, which feed the per-route SQL histograms.
+The numbers are per worker process, like the in-process caches.
+"""
+import bisect
+import contextvars
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.cache import TTLCache
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+# Label for requests that matched no route, so unknown paths can't grow the label set
+UNMATCHED_ROUTE = "<unmatched>"
+
+class Histogram:
+    """Cumulative-bucket histogram; not thread-safe, callers hold the registry lock."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class RequestStats:
+    __slots__ = ("statements", "sql_seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.sql_seconds = 0.0
+
+# Set by the middleware for the duration of a request. Sync endpoints and
+# dependencies run in worker threads that inherit a copy of the context, so
+# they still see (and add to) the same RequestStats object.
+current_request: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar(
+    "metrics_request", default=None
+)
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.requests: Dict[Tuple[str, str, int], int] = defaultdict(int)
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.request_statements: Dict[Tuple[str, str], Histogram] = {}
+        self.request_sql_seconds: Dict[Tuple[str, str], Histogram] = {}
+        self.statements = 0
+        self.sql_seconds = 0.0
+
+    def request_started(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def request_finished(self, method: str, route: str, status_code: int, seconds: float, stats: RequestStats):
+        key = (method, route)
+        with self._lock:
+            self.in_flight -= 1
+            self.requests[(method, route, status_code)] += 1
+            if key not in self.latency:
+                self.latency[key] = Histogram(LATENCY_BUCKETS)
+                self.request_statements[key] = Histogram(STATEMENT_BUCKETS)
+                self.request_sql_seconds[key] = Histogram(LATENCY_BUCKETS)
+            self.latency[key].observe(seconds)
+            self.request_statements[key].observe(stats.statements)
+            self.request_sql_seconds[key].observe(stats.sql_seconds)
+
+    def statement_finished(self, seconds: float):
+        with self._lock:
+            self.statements += 1
+            self.sql_seconds += seconds
+
+metrics = Metrics()
+
+def route_template(scope) -> str:
+    # Routes of included routers carry their path relative to the router, so
+    # the request path's leading segments supply the prefix
+    route = scope.get("route")
+    if route is None or not hasattr(route, "path"):
+        return UNMATCHED_ROUTE
+    prefix = scope["path"].rsplit("/", route.path.count("/"))[0]
+    return prefix + route.path
+
+class MetricsMiddleware:
+    """Plain ASGI middleware, so streaming responses are timed to their last byte."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        metrics.request_started()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            current_request.reset(token)
+            metrics.request_finished(scope["method"], route_template(scope), status_code, elapsed, stats)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["metrics_started"].pop()
+    metrics.statement_finished(elapsed)
+    stats = current_request.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.sql_seconds += elapsed
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute
+    started = context.connection.info.get("metrics_started") if context.connection is not None else None
+    if started:
+        started.pop()
+
+def instrument_engine(engine: Engine):
+    # For an AsyncEngine pass engine.sync_engine
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(**labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+def _family(lines: List[str], name: str, kind: str, help_text: str, samples: Iterable[Tuple[dict, float]]):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+    for labels, value in samples:
+        lines.append(f"{name}{_labels(**labels)} {value}")
+
+def _histogram(lines: List[str], name: str, help_text: str, histograms: Dict[Tuple[str, str], Histogram]):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for (method, route), histogram in sorted(histograms.items()):
+        cumulative = 0
+        for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else bound
+            lines.append(f"{name}_bucket{_labels(method=method, route=route, le=le)} {cumulative}")
+        lines.append(f"{name}_sum{_labels(method=method, route=route)} {histogram.sum}")
+        lines.append(f"{name}_count{_labels(method=method, route=route)} {histogram.count}")
+
+def render_metrics(caches: Dict[str, TTLCache], hashing: Dict[str, float]) -> str:
+    lines: List[str] = []
+    with metrics._lock:
+        _family(lines, "http_requests_total", "counter", "Requests handled, by route and status code", [
+            ({"method": method, "route": route, "status": code}, count)
+            for (method, route, code), count in sorted(metrics.requests.items())
+        ])
+        _family(lines, "http_requests_in_flight", "gauge", "Requests currently being handled", [({}, metrics.in_flight)])
+        _histogram(lines, "http_request_duration_seconds", "Request latency", metrics.latency)
+        _histogram(lines, "http_request_db_statements", "SQL statements per request", metrics.request_statements)
+        _histogram(lines, "http_request_db_seconds", "Time spent in SQL per request", metrics.request_sql_seconds)
+        _family(lines, "db_statements_total", "counter", "SQL statements executed", [({}, metrics.statements)])
+        _family(lines, "db_statement_seconds_total", "counter", "Time spent executing SQL", [({}, metrics.sql_seconds)])
+
+    cache_stats = {name: cache.stats() for name, cache in caches.items()}
+    for field, kind, help_text in (
+        ("hits", "counter", "Cache hits"),
+        ("misses", "counter", "Cache misses"),
+        ("evictions", "counter", "Entries evicted to stay within the size limit"),
+        ("size", "gauge", "Entries currently cached"),
+        ("maxsize", "gauge", "Maximum number of entries"),
+    ):
+        name = f"cache_{field}_total" if kind == "counter" else f"cache_{field}"
+        _family(lines, name, kind, help_text, [
+            ({"cache": cache}, stats[field]) for cache, stats in sorted(cache_stats.items())
+        ])
+
+    for name, field, kind, help_text in (
+        ("hashing_jobs_submitted_total", "submitted", "counter", "Password hashing jobs submitted"),
+        ("hashing_jobs_completed_total", "completed", "counter", "Password hashing jobs completed"),
+        ("hashing_jobs_failed_total", "failed", "counter", "Password hashing jobs that raised"),
+        ("hashing_jobs_rejected_total", "rejected", "counter", "Password hashing jobs rejected because the queue was full"),
+        ("hashing_seconds_total", "total_seconds", "counter", "Time from submission to completion of hashing jobs"),
+        ("hashing_jobs_pending", "pending", "gauge", "Password hashing jobs queued or running"),
+        ("hashing_workers", "workers", "gauge", "Password hashing processes"),
+    ):
+        _family(lines, name, kind, help_text, [({}, hashing[field])])
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,46 @@
+"""Cache updates that wait in the session until its transaction commits.
+
+Mapper events queue what a write changes under a module's key in
+session.info, and that module's after_commit listener takes the queue and
+applies it. A rollback drops only what was queued inside the rolled-back
+transaction. For a SAVEPOINT (begin_nested) that is the entries queued
+since it began, so the batch endpoint can drop one failed item without
+losing the updates of the items that were written.
+"""
+from typing import Any, Dict, List
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, SessionTransaction
+
+QUEUES = "pending_changes"
+MARKS = "pending_marks"
+
+def queue_change(session: Session, key: str, change: Any):
+    session.info.setdefault(QUEUES, {}).setdefault(key, []).append(change)
+
+def take_changes(session: Session, key: str) -> List[Any]:
+    return session.info.get(QUEUES, {}).pop(key, [])
+
+@event.listens_for(Session, "after_transaction_create")
+def _mark_savepoint(session, transaction: SessionTransaction):
+    if transaction.nested:
+        queues: Dict[str, list] = session.info.get(QUEUES, {})
+        session.info.setdefault(MARKS, {})[transaction] = {key: len(changes) for key, changes in queues.items()}
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_rolled_back(session, previous_transaction: SessionTransaction):
+    if previous_transaction.nested:
+        marks = session.info.get(MARKS, {}).pop(previous_transaction, {})
+        for key, changes in session.info.get(QUEUES, {}).items():
+            del changes[marks.get(key, 0):]
+    elif previous_transaction.parent is None:
+        session.info.pop(QUEUES, None)
+
+@event.listens_for(Session, "after_transaction_end")
+def _forget_transaction(session, transaction: SessionTransaction):
+    if transaction.nested:
+        session.info.get(MARKS, {}).pop(transaction, None)
+    elif transaction.parent is None:
+        # Committed queues were taken by after_commit; anything left was never committed
+        session.info.pop(QUEUES, None)
+        session.info.pop(MARKS, None)
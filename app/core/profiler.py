@@ -0,0 +1,173 @@
+"""Development profiler for the SQL issued by each request.
+
+When PROFILER_ENABLED is set, get_db/get_async_db attach a RequestProfile to
+the request's session. Session and engine events then record every statement
+the session runs with its duration and the app code that issued it. Once the
+request is done with the session, the profile is logged:
+
+- at DEBUG, every statement;
+- at WARNING, requests over PROFILER_MAX_STATEMENTS statements or
+  PROFILER_MAX_DB_MS of SQL time;
+- at WARNING, statement shapes repeated PROFILER_REPEAT_THRESHOLD or more
+  times in one request (a probable N+1).
+"""
+import logging
+import os
+import re
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import greenlet
+except ImportError:  # only needed to follow async sessions back to the endpoint
+    greenlet = None
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_DIR = os.path.dirname(APP_DIR)
+# Frames in these files are plumbing, not the code that asked for the query
+SKIPPED_FILES = {os.path.abspath(__file__), os.path.join(APP_DIR, "database.py")}
+LIBRARY_DIRS = tuple({
+    os.path.dirname(os.path.abspath(os.__file__)),
+    *(os.path.abspath(path) for path in sys.path if path.endswith(("site-packages", "dist-packages")))
+})
+
+# Bound parameter lists such as IN (?, ?, ?) vary in length between calls
+_PARAMETER_LIST = re.compile(r"\((?:\s*(?:\?|%\(\w+\)s|\$\d+|:\w+)\s*,)*\s*(?:\?|%\(\w+\)s|\$\d+|:\w+)\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+class Statement(NamedTuple):
+    shape: str
+    seconds: float
+    call_site: str
+
+def statement_shape(statement: str) -> str:
+    return _PARAMETER_LIST.sub("(?)", _WHITESPACE.sub(" ", statement).strip())
+
+def _frames():
+    frame = sys._getframe(2)
+    # Async sessions run their SQL in a child greenlet; the endpoint waits in the parent
+    current = greenlet.getcurrent() if greenlet is not None else None
+    while frame is not None or (current is not None and current.parent is not None):
+        if frame is None:
+            current = current.parent
+            frame = current.gr_frame
+            continue
+        yield frame
+        frame = frame.f_back
+
+def _describe(frame) -> str:
+    filename = os.path.abspath(frame.f_code.co_filename)
+    if filename.startswith(PROJECT_DIR):
+        filename = os.path.relpath(filename, PROJECT_DIR)
+    return f"{filename}:{frame.f_lineno} in {frame.f_code.co_name}"
+
+def call_site() -> str:
+    # Innermost frame in the app, else innermost frame outside the libraries
+    # (e.g. a script or test driving the session)
+    fallback = None
+    for frame in _frames():
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if filename in SKIPPED_FILES:
+            continue
+        if filename.startswith(APP_DIR):
+            return _describe(frame)
+        if fallback is None and not filename.startswith(LIBRARY_DIRS):
+            fallback = frame
+    return _describe(fallback) if fallback is not None else "<unknown>"
+
+class RequestProfile:
+    def __init__(self, label: str):
+        self.label = label
+        self.statements: List[Statement] = []
+
+    @property
+    def db_seconds(self) -> float:
+        return sum(statement.seconds for statement in self.statements)
+
+    def record(self, statement: str, seconds: float, site: str):
+        self.statements.append(Statement(statement_shape(statement), seconds, site))
+
+    def repeated(self, threshold: int) -> Dict[str, List[Statement]]:
+        by_shape = defaultdict(list)
+        for statement in self.statements:
+            by_shape[statement.shape].append(statement)
+        return {shape: runs for shape, runs in by_shape.items() if len(runs) >= threshold}
+
+    def report(self):
+        db_ms = self.db_seconds * 1000
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("%s: %d statements, %.1f ms in SQL", self.label, len(self.statements), db_ms)
+            for statement in self.statements:
+                logger.debug("  %.2f ms  %s  [%s]", statement.seconds * 1000, statement.shape, statement.call_site)
+
+        if len(self.statements) > settings.PROFILER_MAX_STATEMENTS or db_ms > settings.PROFILER_MAX_DB_MS:
+            slowest = sorted(self.statements, key=lambda statement: statement.seconds, reverse=True)[:5]
+            logger.warning(
+                "Slow request %s: %d statements, %.1f ms in SQL (budget %d statements, %d ms); slowest:\n%s",
+                self.label, len(self.statements), db_ms,
+                settings.PROFILER_MAX_STATEMENTS, settings.PROFILER_MAX_DB_MS,
+                "\n".join(
+                    f"  {statement.seconds * 1000:.2f} ms  {statement.shape}  [{statement.call_site}]"
+                    for statement in slowest
+                )
+            )
+
+        for shape, runs in self.repeated(settings.PROFILER_REPEAT_THRESHOLD).items():
+            sites = sorted({statement.call_site for statement in runs})
+            logger.warning(
+                "Probable N+1 in %s: %d x %s (%.1f ms) from %s",
+                self.label, len(runs), shape, sum(statement.seconds for statement in runs) * 1000, ", ".join(sites)
+            )
+
+def start_profile(session: Session, label: str):
+    session.info["profile"] = RequestProfile(label)
+
+def finish_profile(session: Session) -> Optional[RequestProfile]:
+    profile = session.info.pop("profile", None)
+    if profile is not None:
+        profile.report()
+    return profile
+
+def _bind_connection(session, transaction, connection):
+    # Connections are shared through the pool, so the profile is attached per
+    # checkout and removed again on checkin
+    profile = session.info.get("profile")
+    if profile is not None:
+        connection.info["profile"] = profile
+
+def _release_connection(dbapi_connection, connection_record):
+    connection_record.info.pop("profile", None)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if "profile" in conn.info:
+        conn.info.setdefault("profile_started", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = conn.info.get("profile")
+    if profile is not None and conn.info.get("profile_started"):
+        profile.record(statement, time.perf_counter() - conn.info["profile_started"].pop(), call_site())
+
+def _handle_error(context):
+    started = context.connection.info.get("profile_started") if context.connection is not None else None
+    if started:
+        started.pop()
+
+def install_profiler(engine: Engine):
+    # For an AsyncEngine pass engine.sync_engine
+    if not event.contains(Session, "after_begin", _bind_connection):
+        event.listen(Session, "after_begin", _bind_connection)
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "checkin", _release_connection)
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
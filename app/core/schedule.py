@@ -0,0 +1,270 @@
+"""Per-doctor slot bitmaps for booking checks and slot listings.
+
+Each doctor has a WeeklySchedule (which slots their active availabilities
+offer on each weekday) and an Occupancy (which slots are booked on each date
+loaded so far). Both are loaded from the database once and then kept current
+by this worker's own writes. Mapper events queue the change of each
+availability or appointment row in the session. After commit, the change is
+applied to the cached bitmaps. Writes from other workers show up in listings
+once the entries expire. Booking checks compare the cached schedule with the
+doctor's schedule_version first and reload it only when that has moved.
+"""
+import threading
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from itertools import islice
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.cache import TTLCache
+from app.core.pending import queue_change, take_changes
+from app.core.slots import WeeklySchedule, availability_window, merge_open_slots, slot_index
+from app.models.availability import Availability
+from app.models.appointment import Appointment, ACTIVE_STATUSES
+from app.models.doctor import Doctor
+
+# doctor id -> WeeklySchedule of the doctor's active availabilities
+schedule_cache = TTLCache(
+    maxsize=settings.SCHEDULE_CACHE_MAX_ENTRIES, ttl=settings.SCHEDULE_CACHE_TTL_SECONDS
+)
+# doctor id -> Occupancy of the dates loaded so far
+occupancy_cache = TTLCache(
+    maxsize=settings.SCHEDULE_CACHE_MAX_ENTRIES, ttl=settings.SCHEDULE_CACHE_TTL_SECONDS
+)
+
+# Bumped per doctor whenever a commit changes their bitmaps, so a load that
+# raced with the commit does not store what it read before it
+_generations: Dict[int, int] = defaultdict(int)
+_lock = threading.Lock()
+
+# Bookings are loaded a week at a time by find_open_slots
+SEARCH_CHUNK_DAYS = 7
+
+class Occupancy:
+    """Booked slots of one doctor as a bitmap per date."""
+
+    __slots__ = ("days",)
+
+    def __init__(self):
+        self.days: Dict[date, int] = {}
+
+    def mark(self, slot: datetime, booked: bool):
+        # Dates that were never loaded are left for the next load to read
+        day = slot.date()
+        if day in self.days:
+            bit = 1 << slot_index(slot)
+            self.days[day] = self.days[day] | bit if booked else self.days[day] & ~bit
+
+def get_schedules(db: Session, doctor_ids: Iterable[int]) -> Dict[int, WeeklySchedule]:
+    # Cached schedules, and one query for all the doctors that were not cached
+    schedules: Dict[int, WeeklySchedule] = {}
+    missing = []
+    for doctor_id in doctor_ids:
+        schedule = schedule_cache.get(doctor_id)
+        if schedule is None:
+            missing.append(doctor_id)
+        else:
+            schedules[doctor_id] = schedule
+    if not missing:
+        return schedules
+
+    generations = {doctor_id: _generations[doctor_id] for doctor_id in missing}
+    availabilities = defaultdict(list)
+    versions: Dict[int, int] = {}
+    # The version is read in the same statement as the windows it describes
+    for row in db.query(
+        Doctor.id.label("doctor_id"),
+        Doctor.schedule_version,
+        Availability.id,
+        Availability.day_of_week,
+        Availability.start_time,
+        Availability.end_time,
+        Availability.is_active
+    ).outerjoin(
+        Availability,
+        (Availability.doctor_id == Doctor.id) & (Availability.is_active == True)
+    ).filter(
+        Doctor.id.in_(missing)
+    ):
+        versions[row.doctor_id] = row.schedule_version
+        if row.id is not None:
+            availabilities[row.doctor_id].append(row)
+
+    with _lock:
+        for doctor_id in missing:
+            schedules[doctor_id] = WeeklySchedule(availabilities[doctor_id], versions.get(doctor_id))
+            if generations[doctor_id] == _generations[doctor_id]:
+                schedule_cache.set(doctor_id, schedules[doctor_id])
+    return schedules
+
+def get_schedule(db: Session, doctor_id: int) -> WeeklySchedule:
+    return get_schedules(db, [doctor_id])[doctor_id]
+
+def current_schedule(db: Session, doctor_id: int) -> WeeklySchedule:
+    # For booking checks: the cached entry may still have an availability
+    # another worker has since removed. One primary-key read of the doctor's
+    # schedule_version tells; the windows are read again only when it moved.
+    version = db.query(Doctor.schedule_version).filter(Doctor.id == doctor_id).scalar()
+    schedule = schedule_cache.get(doctor_id)
+    if schedule is not None and schedule.version == version:
+        return schedule
+    schedule_cache.pop(doctor_id)
+    return get_schedule(db, doctor_id)
+
+def get_occupancies(
+    db: Session,
+    doctor_ids: Iterable[int],
+    start_date: date,
+    end_date: date
+) -> Dict[int, Dict[date, int]]:
+    """Booked-slot bitmaps of start_date..end_date (inclusive), by doctor and date.
+
+    Dates not cached yet are read with one query over their span for all the
+    doctors that miss any.
+    """
+    days = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+    occupancies: Dict[int, Dict[date, int]] = {}
+    missing: Dict[int, List[date]] = {}
+    for doctor_id in doctor_ids:
+        occupancy = occupancy_cache.get(doctor_id)
+        cached = occupancy.days if occupancy is not None else {}
+        occupancies[doctor_id] = {day: cached[day] for day in days if day in cached}
+        if len(occupancies[doctor_id]) < len(days):
+            missing[doctor_id] = [day for day in days if day not in occupancies[doctor_id]]
+    if not missing:
+        return occupancies
+
+    generations = {doctor_id: _generations[doctor_id] for doctor_id in missing}
+    loaded = {doctor_id: dict.fromkeys(missing_days, 0) for doctor_id, missing_days in missing.items()}
+    first = min(missing_days[0] for missing_days in missing.values())
+    last = max(missing_days[-1] for missing_days in missing.values())
+    booked = db.query(Appointment.doctor_id, Appointment.slot_start).filter(
+        Appointment.doctor_id.in_(list(missing)),
+        Appointment.slot_start >= datetime.combine(first, time.min),
+        Appointment.slot_start < datetime.combine(last + timedelta(days=1), time.min),
+        Appointment.status.in_(ACTIVE_STATUSES)
+    )
+    for doctor_id, slot in booked:
+        masks = loaded[doctor_id]
+        if slot.date() in masks:
+            masks[slot.date()] |= 1 << slot_index(slot)
+
+    with _lock:
+        for doctor_id, masks in loaded.items():
+            occupancies[doctor_id].update(masks)
+            if generations[doctor_id] != _generations[doctor_id]:
+                continue
+            occupancy = occupancy_cache.peek(doctor_id)
+            if occupancy is None:
+                occupancy = Occupancy()
+                occupancy_cache.set(doctor_id, occupancy)
+            occupancy.days.update(masks)
+    return occupancies
+
+def get_occupancy(db: Session, doctor_id: int, start_date: date, end_date: date) -> Dict[date, int]:
+    return get_occupancies(db, [doctor_id], start_date, end_date)[doctor_id]
+
+def find_open_slots(
+    db: Session,
+    doctor_ids: Iterable[int],
+    after: datetime,
+    days: int,
+    limit: int
+) -> List[Tuple[datetime, int]]:
+    """The first `limit` free slots of any of the doctors, as (start, doctor id).
+
+    Searches from `after` through the following `days` days, a week at a
+    time, so bookings are only loaded for as many weeks as it takes to fill
+    the result.
+    """
+    schedules = {
+        doctor_id: schedule
+        for doctor_id, schedule in get_schedules(db, doctor_ids).items()
+        if any(schedule.full)
+    }
+    found: List[Tuple[datetime, int]] = []
+    chunk_start = after.date()
+    last = after.date() + timedelta(days=days - 1)
+    while schedules and chunk_start <= last and len(found) < limit:
+        chunk_end = min(chunk_start + timedelta(days=SEARCH_CHUNK_DAYS - 1), last)
+        occupancies = get_occupancies(db, schedules, chunk_start, chunk_end)
+        found.extend(islice(
+            merge_open_slots(schedules, occupancies, after, chunk_start, chunk_end), limit - len(found)
+        ))
+        chunk_start = chunk_end + timedelta(days=1)
+    return found
+
+def _queue(target, change: tuple):
+    session = Session.object_session(target)
+    if session is not None:
+        queue_change(session, "schedule_changes", change)
+
+def _previous(target, key: str):
+    # Value before this flush; None when it changed from a value that was never loaded
+    history = inspect(target).attrs[key].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.added and not history.unchanged:
+        return None
+    return getattr(target, key)
+
+@event.listens_for(Availability, "after_insert")
+@event.listens_for(Availability, "after_update")
+def _availability_written(mapper, connection, target):
+    _queue(target, ("window", target.doctor_id, target.id, availability_window(target)))
+
+@event.listens_for(Availability, "after_delete")
+def _availability_deleted(mapper, connection, target):
+    _queue(target, ("window", target.doctor_id, target.id, None))
+
+@event.listens_for(Appointment, "after_insert")
+def _appointment_inserted(mapper, connection, target):
+    if target.status in ACTIVE_STATUSES:
+        _queue(target, ("slot", target.doctor_id, target.slot_start, True))
+
+@event.listens_for(Appointment, "after_update")
+def _appointment_updated(mapper, connection, target):
+    # Cancel, reschedule and status changes: release the old slot, then hold the new one
+    doctor_id, slot, status = (_previous(target, key) for key in ("doctor_id", "slot_start", "status"))
+    if doctor_id is None or slot is None or status is None:
+        _queue(target, ("drop", target.doctor_id))
+        return
+    if status in ACTIVE_STATUSES:
+        _queue(target, ("slot", doctor_id, slot, False))
+    if target.status in ACTIVE_STATUSES:
+        _queue(target, ("slot", target.doctor_id, target.slot_start, True))
+
+@event.listens_for(Appointment, "after_delete")
+def _appointment_deleted(mapper, connection, target):
+    if target.status in ACTIVE_STATUSES:
+        _queue(target, ("slot", target.doctor_id, target.slot_start, False))
+
+@event.listens_for(Doctor, "after_delete")
+def _doctor_deleted(mapper, connection, target):
+    _queue(target, ("drop", target.id))
+
+@event.listens_for(Session, "after_commit")
+def _apply_after_commit(session):
+    changes = take_changes(session, "schedule_changes")
+    if not changes:
+        return
+    with _lock:
+        for kind, doctor_id, *change in changes:
+            _generations[doctor_id] += 1
+            if kind == "window":
+                schedule = schedule_cache.peek(doctor_id)
+                if schedule is not None:
+                    schedule.set_window(*change)
+                    # The new schedule_version is not known here, so the next
+                    # booking check reloads; listings keep using this entry
+                    schedule.version = None
+            elif kind == "slot":
+                occupancy = occupancy_cache.peek(doctor_id)
+                if occupancy is not None:
+                    occupancy.mark(*change)
+            else:
+                schedule_cache.pop(doctor_id)
+                occupancy_cache.pop(doctor_id)
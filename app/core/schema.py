@@ -0,0 +1,63 @@
+"""Checks the database against the Alembic migrations.
+
+The schema is owned by the migrations in alembic/. Workers do not create
+tables. At startup they only confirm the database is at the head revision:
+Alembic's script directory gives the heads, and the alembic_version table is
+read directly. Alembic is imported only when the check runs.
+"""
+import os
+from typing import Set
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from app.database import Base
+import app.models  # noqa: F401  registers the tables on Base.metadata
+import app.core.search  # noqa: F401  adds the doctor search index DDL
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+VERSION_TABLE = "alembic_version"
+
+class SchemaOutOfDateError(RuntimeError):
+    pass
+
+def _script_directory():
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    # Resolve alembic/ from the project root rather than the working directory
+    config = Config(os.path.join(PROJECT_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(PROJECT_DIR, "alembic"))
+    return ScriptDirectory.from_config(config)
+
+def head_revisions() -> Set[str]:
+    return set(_script_directory().get_heads())
+
+def current_revisions(engine: Engine) -> Set[str]:
+    with engine.connect() as connection:
+        if not inspect(connection).has_table(VERSION_TABLE):
+            return set()
+        return set(connection.execute(text(f"SELECT version_num FROM {VERSION_TABLE}")).scalars())
+
+def verify_schema(engine: Engine):
+    heads, current = head_revisions(), current_revisions(engine)
+    if current != heads:
+        raise SchemaOutOfDateError(
+            f"Database is at revision {', '.join(sorted(current)) or '<none>'} but the code expects "
+            f"{', '.join(sorted(heads))}; run `alembic upgrade head`"
+        )
+
+def create_schema(engine: Engine):
+    """Create every table from the models and stamp the database at head.
+
+    Only for throwaway databases such as benchmark runs; real deployments
+    apply the migrations. A database that already has a revision is left alone.
+    """
+    from alembic.runtime.migration import MigrationContext
+
+    with engine.begin() as connection:
+        context = MigrationContext.configure(connection)
+        if context.get_current_heads():
+            return
+        Base.metadata.create_all(bind=connection)
+        context.stamp(_script_directory(), "heads")
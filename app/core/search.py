@@ -0,0 +1,155 @@
+import re
+from collections import defaultdict
+from typing import Iterable, List, Set
+
+from sqlalchemy import DDL, bindparam, event, or_, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.models.doctor import Doctor, WorkExperience, AcademicHistory
+
+# Full-text index over doctors, one row per doctor:
+#   SQLite     - FTS5 virtual table, rowid = doctor id, ranked with bm25
+#   PostgreSQL - weighted tsvector per doctor with a GIN index, ranked with ts_rank
+# The index is refreshed from the session flush events below, so every write
+# path (API, imports, scripts) keeps it current.
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS doctor_search USING fts5("
+    "full_name, specialization, hospitals, institutions, tokenize = 'unicode61 remove_diacritics 2')",
+]
+POSTGRESQL_DDL = [
+    "CREATE TABLE IF NOT EXISTS doctor_search ("
+    "doctor_id INTEGER PRIMARY KEY REFERENCES doctors(id) ON DELETE CASCADE, "
+    "document TSVECTOR NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS ix_doctor_search_document ON doctor_search USING GIN (document)",
+]
+
+# Column weights: name and specialization matter most, then hospitals, then institutions
+SQLITE_RANK = "bm25(doctor_search, 10.0, 8.0, 3.0, 2.0)"
+POSTGRESQL_DOCUMENT = (
+    "setweight(to_tsvector('simple', :full_name), 'A') || "
+    "setweight(to_tsvector('simple', :specialization), 'A') || "
+    "setweight(to_tsvector('simple', :hospitals), 'B') || "
+    "setweight(to_tsvector('simple', :institutions), 'C')"
+)
+
+for statement in SQLITE_DDL:
+    event.listen(Base.metadata, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+for statement in POSTGRESQL_DDL:
+    event.listen(Base.metadata, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+event.listen(
+    Base.metadata, "before_drop",
+    DDL("DROP TABLE IF EXISTS doctor_search").execute_if(dialect=("sqlite", "postgresql"))
+)
+
+def is_supported(dialect_name: str) -> bool:
+    return dialect_name in ("sqlite", "postgresql")
+
+def reindex_doctors(connection: Connection, doctor_ids: Iterable[int]):
+    doctor_ids = list(doctor_ids)
+    dialect = connection.dialect.name
+    if not doctor_ids or not is_supported(dialect):
+        return
+
+    doctors = connection.execute(
+        select(Doctor.id, Doctor.full_name, Doctor.specialization).where(Doctor.id.in_(doctor_ids))
+    ).all()
+    hospitals = defaultdict(list)
+    for doctor_id, hospital_name in connection.execute(
+        select(WorkExperience.doctor_id, WorkExperience.hospital_name)
+        .where(WorkExperience.doctor_id.in_(doctor_ids))
+    ):
+        hospitals[doctor_id].append(hospital_name)
+    institutions = defaultdict(list)
+    for doctor_id, institution in connection.execute(
+        select(AcademicHistory.doctor_id, AcademicHistory.institution)
+        .where(AcademicHistory.doctor_id.in_(doctor_ids))
+    ):
+        institutions[doctor_id].append(institution)
+
+    rows = [
+        {
+            "doctor_id": doctor.id,
+            "full_name": doctor.full_name or "",
+            "specialization": doctor.specialization or "",
+            "hospitals": " ".join(hospitals[doctor.id]),
+            "institutions": " ".join(institutions[doctor.id]),
+        }
+        for doctor in doctors
+    ]
+
+    # Deleted doctors simply drop out of the index
+    key = "rowid" if dialect == "sqlite" else "doctor_id"
+    connection.execute(
+        text(f"DELETE FROM doctor_search WHERE {key} IN :doctor_ids")
+        .bindparams(bindparam("doctor_ids", expanding=True)),
+        {"doctor_ids": doctor_ids}
+    )
+    if not rows:
+        return
+    if dialect == "sqlite":
+        connection.execute(text(
+            "INSERT INTO doctor_search (rowid, full_name, specialization, hospitals, institutions) "
+            "VALUES (:doctor_id, :full_name, :specialization, :hospitals, :institutions)"
+        ), rows)
+    else:
+        connection.execute(text(
+            f"INSERT INTO doctor_search (doctor_id, document) VALUES (:doctor_id, {POSTGRESQL_DOCUMENT})"
+        ), rows)
+
+def rebuild_index(connection: Connection):
+    reindex_doctors(connection, connection.execute(select(Doctor.id)).scalars().all())
+
+def _terms(query: str) -> List[str]:
+    return re.findall(r"\w+", query.lower())
+
+def search_doctor_ids(db: Session, query: str, limit: int, offset: int = 0) -> List[int]:
+    # Every term must match, each as a prefix ("card" matches "cardiology")
+    terms = _terms(query)
+    if not terms:
+        return []
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        stmt = text(
+            f"SELECT rowid FROM doctor_search WHERE doctor_search MATCH :match "
+            f"ORDER BY {SQLITE_RANK}, rowid LIMIT :limit OFFSET :offset"
+        )
+        match = " ".join(f'"{term}"*' for term in terms)
+    elif dialect == "postgresql":
+        stmt = text(
+            "SELECT doctor_id FROM doctor_search, to_tsquery('simple', :match) AS query "
+            "WHERE document @@ query ORDER BY ts_rank(document, query) DESC, doctor_id "
+            "LIMIT :limit OFFSET :offset"
+        )
+        match = " & ".join(f"{term}:*" for term in terms)
+    else:
+        # No full-text index on other backends: unranked substring match
+        stmt = select(Doctor.id).where(*[
+            or_(Doctor.full_name.ilike(f"%{term}%"), Doctor.specialization.ilike(f"%{term}%"))
+            for term in terms
+        ]).order_by(Doctor.id).limit(limit).offset(offset)
+        return db.execute(stmt).scalars().all()
+    return db.execute(stmt, {"match": match, "limit": limit, "offset": offset}).scalars().all()
+
+def _affected_doctor_ids(session: Session) -> Set[int]:
+    doctor_ids = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Doctor):
+            doctor_ids.add(obj.id)
+        elif isinstance(obj, (WorkExperience, AcademicHistory)) and obj.doctor_id is not None:
+            doctor_ids.add(obj.doctor_id)
+    return doctor_ids
+
+@event.listens_for(Session, "after_flush")
+def _collect_reindex(session, flush_context):
+    doctor_ids = _affected_doctor_ids(session)
+    if doctor_ids:
+        session.info.setdefault("search_reindex", set()).update(doctor_ids)
+
+@event.listens_for(Session, "after_flush_postexec")
+def _apply_reindex(session, flush_context):
+    doctor_ids = session.info.pop("search_reindex", None)
+    if doctor_ids:
+        reindex_doctors(session.connection(), doctor_ids)
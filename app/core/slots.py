@@ -0,0 +1,156 @@
+import heapq
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+SLOT_MINUTES = 30
+SLOT_DURATION = timedelta(minutes=SLOT_MINUTES)
+
+# Matches the values stored in Availability.day_of_week; indexed by date.weekday()
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+def local_naive(value: datetime) -> datetime:
+    # Appointment times are stored as naive local times; aware input is converted to one
+    if value.tzinfo is not None:
+        return value.astimezone().replace(tzinfo=None)
+    return value
+
+def slot_start(value: datetime) -> datetime:
+    # The grid slot a booking falls in; two active appointments may not share one
+    return value.replace(minute=value.minute - value.minute % SLOT_MINUTES, second=0, microsecond=0)
+
+def slot_index(value) -> int:
+    # Position of a datetime or time on its day's slot grid, i.e. its bit in a day bitmap
+    return (value.hour * 60 + value.minute) // SLOT_MINUTES
+
+def _minutes(value: time, round_up: bool = False) -> int:
+    minutes = value.hour * 60 + value.minute
+    if round_up and (value.second or value.microsecond):
+        minutes += 1
+    return minutes
+
+def _bits(first: int, last: int) -> int:
+    # Bits first..last-1 set
+    return (1 << last) - (1 << first) if last > first else 0
+
+# (weekday index, start_time, end_time) of an active availability
+Window = Tuple[int, time, time]
+
+def availability_window(availability) -> Optional[Window]:
+    if not availability.is_active or availability.day_of_week not in WEEKDAYS:
+        return None
+    return WEEKDAYS.index(availability.day_of_week), availability.start_time, availability.end_time
+
+class WeeklySchedule:
+    """A doctor's active availability as one slot bitmap per weekday.
+
+    Bit i of `full[day]` is set when slot i lies entirely inside a window;
+    those are the slots offered to patients. `partial[day]` marks slots a
+    window only touches (an unaligned start or end), where a booking time is
+    checked against the windows themselves. Windows are kept by availability
+    id so a single create, update or delete only rebuilds its weekday.
+    `version` is the doctor's schedule_version the windows were read at, or
+    None once they have been changed in place.
+    """
+
+    __slots__ = ("windows", "full", "partial", "version")
+
+    def __init__(self, availabilities: Iterable = (), version: Optional[int] = None):
+        self.version = version
+        self.windows: Dict[int, Window] = {}
+        self.full = [0] * len(WEEKDAYS)
+        self.partial = [0] * len(WEEKDAYS)
+        for availability in availabilities:
+            window = availability_window(availability)
+            if window is not None:
+                self.windows[availability.id] = window
+        for day in range(len(WEEKDAYS)):
+            self._rebuild(day)
+
+    def _rebuild(self, day: int):
+        full = touched = 0
+        for weekday, start, end in self.windows.values():
+            if weekday != day:
+                continue
+            # Whole slots from the first grid line at or after start to the last one before end
+            full |= _bits(-(-_minutes(start, round_up=True) // SLOT_MINUTES), _minutes(end) // SLOT_MINUTES)
+            touched |= _bits(slot_index(start), slot_index(end) + 1)
+        self.full[day] = full
+        self.partial[day] = touched & ~full
+
+    def set_window(self, availability_id: int, window: Optional[Window]):
+        # Add, replace or (with None) remove one availability. The dict is
+        # replaced rather than mutated so concurrent readers can iterate the old one
+        windows = dict(self.windows)
+        old = windows.pop(availability_id, None)
+        if window is not None:
+            windows[availability_id] = window
+        self.windows = windows
+        for day in {changed[0] for changed in (old, window) if changed is not None}:
+            self._rebuild(day)
+
+    def is_available(self, when: datetime) -> bool:
+        # Same rule as before the bitmaps: some active window with start <= time <= end
+        day, bit = when.weekday(), 1 << slot_index(when)
+        if self.full[day] & bit:
+            return True
+        if not self.partial[day] & bit:
+            return False
+        moment = when.time()
+        return any(
+            weekday == day and start <= moment <= end for weekday, start, end in self.windows.values()
+        )
+
+def iter_bits(mask: int) -> Iterator[int]:
+    # Indexes of the set bits, lowest first
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+def open_slots(
+    schedule: WeeklySchedule,
+    occupancy: Dict[date, int],
+    start_date: date,
+    end_date: date
+) -> Iterator[datetime]:
+    """Yield free slot start times between start_date and end_date (inclusive).
+
+    `occupancy` maps each date to the bitmap of its booked slots, so a day's
+    free slots are its weekday's offered slots minus that bitmap.
+    """
+    current = start_date
+    while current <= end_date:
+        midnight = datetime.combine(current, time.min)
+        for index in iter_bits(schedule.full[current.weekday()] & ~occupancy.get(current, 0)):
+            yield midnight + index * SLOT_DURATION
+        current += timedelta(days=1)
+
+def _doctor_open_slots(
+    doctor_id: int,
+    schedule: WeeklySchedule,
+    occupancy: Dict[date, int],
+    after: datetime,
+    start_date: date,
+    end_date: date
+) -> Iterator[Tuple[datetime, int]]:
+    for slot in open_slots(schedule, occupancy, start_date, end_date):
+        if slot >= after:
+            yield slot, doctor_id
+
+def merge_open_slots(
+    schedules: Dict[int, WeeklySchedule],
+    occupancies: Dict[int, Dict[date, int]],
+    after: datetime,
+    start_date: date,
+    end_date: date
+) -> Iterator[Tuple[datetime, int]]:
+    """Yield (slot start, doctor id) of every doctor's free slots, earliest first.
+
+    Each doctor's slots already come out in order, so this is a lazy k-way
+    merge: taking the first n results only advances each doctor's stream as
+    far as needed. Ties go to the lower doctor id.
+    """
+    return heapq.merge(*(
+        _doctor_open_slots(doctor_id, schedule, occupancies[doctor_id], after, start_date, end_date)
+        for doctor_id, schedule in schedules.items()
+    ))
@@ -1,20 +1,148 @@
-from sqlalchemy import create_engine
+from typing import NamedTuple, Optional
+
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from app.config import settings
 
-engine = create_engine(
-    settings.DATABASE_URL, connect_args={"check_same_thread": False}
-)
+class StorageProfile(NamedTuple):
+    # SQLite pragmas, applied to every new connection (None keeps SQLite's default)
+    journal_mode: Optional[str] = None
+    synchronous: Optional[str] = None
+    mmap_size: Optional[int] = None
+    cache_size: Optional[int] = None  # negative values are KiB, positive values pages
+    busy_timeout: Optional[int] = None  # milliseconds
+    # Connection pool of server databases (None keeps SQLAlchemy's default)
+    pool_size: Optional[int] = None
+    max_overflow: Optional[int] = None
+    pool_recycle: Optional[int] = None  # seconds
+    pool_pre_ping: bool = False
+
+STORAGE_PROFILES = {
+    # Driver and SQLAlchemy defaults: rollback journal, every commit blocks readers
+    "default": StorageProfile(),
+    # SQLite in WAL mode: readers never wait for the writer. Commits are durable
+    # once checkpointed, so a power cut can lose the last few transactions but
+    # never corrupts the file. Server databases get a larger, self-healing pool
+    "concurrent": StorageProfile(
+        journal_mode="WAL", synchronous="NORMAL", mmap_size=256 * 1024 * 1024, cache_size=-64000,
+        busy_timeout=5000, pool_size=10, max_overflow=20, pool_recycle=1800, pool_pre_ping=True
+    ),
+    # As "concurrent", with an fsync on every SQLite commit
+    "durable": StorageProfile(
+        journal_mode="WAL", synchronous="FULL", mmap_size=256 * 1024 * 1024, cache_size=-64000,
+        busy_timeout=5000, pool_size=10, max_overflow=20, pool_recycle=1800, pool_pre_ping=True
+    ),
+}
+
+def get_storage_profile(name: str) -> StorageProfile:
+    if name not in STORAGE_PROFILES:
+        raise ValueError(f"Unknown DATABASE_PROFILE '{name}', expected one of {', '.join(STORAGE_PROFILES)}")
+    return STORAGE_PROFILES[name]
+
+def engine_options(url: str, profile: StorageProfile) -> dict:
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite":
+        # Pool sizing is left to SQLAlchemy's SQLite defaults; contention is
+        # handled by the pragmas instead. Sessions hand pysqlite connections
+        # between threadpool threads.
+        return {"connect_args": {"check_same_thread": False}} if url.get_driver_name() == "pysqlite" else {}
+    options = {"pool_pre_ping": profile.pool_pre_ping}
+    for name in ("pool_size", "max_overflow", "pool_recycle"):
+        if getattr(profile, name) is not None:
+            options[name] = getattr(profile, name)
+    return options
+
+def apply_storage_profile(engine: Engine, profile: StorageProfile):
+    # For an AsyncEngine pass engine.sync_engine
+    if engine.dialect.name != "sqlite":
+        return
+    pragmas = [
+        (name, getattr(profile, name))
+        for name in ("busy_timeout", "journal_mode", "synchronous", "mmap_size", "cache_size")
+        if getattr(profile, name) is not None
+    ]
+    if not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas:
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+def create_storage_engine(url: str, profile_name: str) -> Engine:
+    profile = get_storage_profile(profile_name)
+    engine = create_engine(url, **engine_options(url, profile))
+    apply_storage_profile(engine, profile)
+    return engine
+
+engine = create_storage_engine(settings.DATABASE_URL, settings.DATABASE_PROFILE)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+if settings.PROFILER_ENABLED:
+    from app.core.profiler import install_profiler, start_profile, finish_profile
+
+    install_profiler(engine)
+
 # Dependency to get DB session
-def get_db():
+def get_db(request: Request):
     db = SessionLocal()
+    if settings.PROFILER_ENABLED:
+        start_profile(db, f"{request.method} {request.url.path}")
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+        if settings.PROFILER_ENABLED:
+            finish_profile(db)
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+def get_async_database_url() -> str:
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    url = make_url(settings.DATABASE_URL)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}', set ASYNC_DATABASE_URL")
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+# The async engine is only created when enabled so the sync path doesn't need
+# greenlet or an async driver installed
+async_engine = None
+AsyncSessionLocal = None
+
+if settings.ASYNC_DB_ENABLED:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_url = get_async_database_url()
+    async_profile = get_storage_profile(settings.DATABASE_PROFILE)
+    async_engine = create_async_engine(async_url, **engine_options(async_url, async_profile))
+    apply_storage_profile(async_engine.sync_engine, async_profile)
+    # Objects must stay readable after commit: lazy refreshes can't run outside the event loop
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False
+    )
+    if settings.PROFILER_ENABLED:
+        install_profiler(async_engine.sync_engine)
+
+# Dependency to get async DB session
+async def get_async_db(request: Request):
+    async with AsyncSessionLocal() as db:
+        if settings.PROFILER_ENABLED:
+            start_profile(db.sync_session, f"{request.method} {request.url.path}")
+        try:
+            yield db
+        finally:
+            if settings.PROFILER_ENABLED:
+                finish_profile(db.sync_session)
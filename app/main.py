@@ -1,18 +1,55 @@
-from fastapi import FastAPI
+import time
+
+# Imports below are part of the startup breakdown
+IMPORTS_STARTED = time.perf_counter()
+
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.docs import get_swagger_ui_html, get_redoc_html
 from fastapi.openapi.utils import get_openapi
+from sqlalchemy.orm.exc import StaleDataError
 
 from app.config import settings
 from app.api import api_router
-from app.database import engine, Base
+from app.database import engine, async_engine
+from app.core.hashing import hashing_executor, HashingQueueFullError
+from app.core.auth_cache import token_cache, principal_cache
+from app.core.availability_cache import availability_cache
+from app.core.schedule import schedule_cache, occupancy_cache
+from app.core.calendar import calendar_cache, calendar_token_cache
+from app.core.schema import verify_schema
 
-# Create tables in the database
-Base.metadata.create_all(bind=engine)
+if settings.METRICS_ENABLED:
+    from app.core.metrics import MetricsMiddleware, instrument_engine, render_metrics
+
+# uvicorn's own logger, so the report sits next to its startup messages
+logger = logging.getLogger("uvicorn.error")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Tables come from the Alembic migrations; workers only check the revision,
+    # and not at all in production where the deploy runs the migrations
+    started = time.perf_counter()
+    timings = {"imports": IMPORTS_FINISHED - IMPORTS_STARTED}
+    if settings.ENVIRONMENT != "production":
+        verify_schema(engine)
+        timings["schema_check"] = time.perf_counter() - started
+    timings["total"] = timings["imports"] + time.perf_counter() - started
+    app.state.startup_timings = {name: round(seconds * 1000, 1) for name, seconds in timings.items()}
+    logger.info(
+        "Startup took %s", ", ".join(f"{name} {ms} ms" for name, ms in app.state.startup_timings.items())
+    )
+    yield
+    hashing_executor.shutdown()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan
 )
 
 # Set up CORS
@@ -30,6 +67,30 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.METRICS_ENABLED:
+    # Outermost, so the timing includes every other middleware
+    app.add_middleware(MetricsMiddleware)
+    instrument_engine(engine)
+    if async_engine is not None:
+        instrument_engine(async_engine.sync_engine)
+
+@app.exception_handler(HashingQueueFullError)
+def hashing_queue_full_handler(request: Request, exc: HashingQueueFullError):
+    # Shed credential work instead of letting it queue behind the request workers
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Server is busy, please retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+@app.exception_handler(StaleDataError)
+def stale_data_handler(request: Request, exc: StaleDataError):
+    # Another request changed the row since it was read
+    return JSONResponse(
+        status_code=status.HTTP_409_CONFLICT,
+        content={"detail": "The resource was modified by another request, please retry"},
+    )
+
 # Include routers
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -37,5 +98,40 @@ app.include_router(api_router, prefix=settings.API_V1_STR)
 def read_root():
     return {"message": "Welcome to the Appointment Booking API"}
 
+if settings.CACHE_STATS_ENABLED:
+    @app.get("/cache/stats", include_in_schema=False)
+    def read_cache_stats():
+        # Hit/miss counters of this worker's in-process caches
+        return {
+            "availability": availability_cache.stats(),
+            "auth_tokens": token_cache.stats(),
+            "auth_principals": principal_cache.stats(),
+            "schedules": schedule_cache.stats(),
+            "occupancy": occupancy_cache.stats(),
+            "calendars": calendar_cache.stats(),
+            "calendar_tokens": calendar_token_cache.stats(),
+        }
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+    def read_metrics():
+        return PlainTextResponse(
+            render_metrics(
+                caches={
+                    "availability": availability_cache,
+                    "auth_tokens": token_cache,
+                    "auth_principals": principal_cache,
+                    "schedules": schedule_cache,
+                    "occupancy": occupancy_cache,
+                    "calendars": calendar_cache,
+                    "calendar_tokens": calendar_token_cache,
+                },
+                hashing=hashing_executor.stats()
+            ),
+            media_type="text/plain; version=0.0.4; charset=utf-8"
+        )
+
+IMPORTS_FINISHED = time.perf_counter()
+
 # FastAPI automatically generates OpenAPI documentation
 # Access it at /docs or /redoc
\ No newline at end of file
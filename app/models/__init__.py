@@ -1,4 +1,5 @@
 from app.models.doctor import Doctor, WorkExperience, AcademicHistory
 from app.models.patient import Patient
 from app.models.availability import Availability
-from app.models.appointment import Appointment, AppointmentStatus
\ No newline at end of file
+from app.models.appointment import Appointment, AppointmentStatus, ACTIVE_STATUSES
+from app.models.account import Account, AccountRole
\ No newline at end of file
@@ -0,0 +1,72 @@
+from sqlalchemy import Column, Integer, String, Boolean, UniqueConstraint, event, inspect
+import enum
+from app.database import Base
+from app.models.doctor import Doctor
+from app.models.patient import Patient
+
+class AccountRole(str, enum.Enum):
+    DOCTOR = "doctor"
+    PATIENT = "patient"
+
+class Account(Base):
+    """Login directory: one row per email across doctors and patients.
+
+    Rows are written by the mapper events below whenever a doctor or patient
+    is inserted, updated or deleted, so login resolves a principal with a
+    single indexed lookup and emails stay unique across both roles.
+    """
+    __tablename__ = "accounts"
+    __table_args__ = (
+        UniqueConstraint("role", "principal_id", name="uq_accounts_role_principal"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    email = Column(String(100), unique=True, index=True, nullable=False)
+    role = Column(String(10), nullable=False)
+    principal_id = Column(Integer, nullable=False)
+    hashed_password = Column(String(100), nullable=False)
+    is_active = Column(Boolean, default=True)
+
+    @property
+    def subject(self) -> str:
+        # JWT subject used by get_current_user
+        return f"{'D' if self.role == AccountRole.DOCTOR else 'P'}{self.principal_id}"
+
+def _role(target) -> AccountRole:
+    return AccountRole.DOCTOR if isinstance(target, Doctor) else AccountRole.PATIENT
+
+def _account_values(target) -> dict:
+    return {
+        "email": target.email,
+        "hashed_password": target.hashed_password,
+        "is_active": True if target.is_active is None else target.is_active,
+    }
+
+@event.listens_for(Doctor, "after_insert")
+@event.listens_for(Patient, "after_insert")
+def _create_account(mapper, connection, target):
+    connection.execute(Account.__table__.insert().values(
+        role=_role(target).value, principal_id=target.id, **_account_values(target)
+    ))
+
+@event.listens_for(Doctor, "after_update")
+@event.listens_for(Patient, "after_update")
+def _update_account(mapper, connection, target):
+    # Only the login fields are copied; other updates (profile, row version) leave the account alone
+    state = inspect(target)
+    if not any(state.attrs[key].history.has_changes() for key in ("email", "hashed_password", "is_active")):
+        return
+    accounts = Account.__table__
+    connection.execute(accounts.update().where(
+        accounts.c.role == _role(target).value,
+        accounts.c.principal_id == target.id
+    ).values(**_account_values(target)))
+
+@event.listens_for(Doctor, "after_delete")
+@event.listens_for(Patient, "after_delete")
+def _delete_account(mapper, connection, target):
+    accounts = Account.__table__
+    connection.execute(accounts.delete().where(
+        accounts.c.role == _role(target).value,
+        accounts.c.principal_id == target.id
+    ))
@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, String, Enum, Text
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, String, Enum, Text, Index, event, text
 from sqlalchemy.orm import relationship
 import enum
 from app.database import Base
+from app.core.slots import slot_start
 
 class AppointmentStatus(str, enum.Enum):
     PENDING = "pending"
@@ -10,16 +11,45 @@ class AppointmentStatus(str, enum.Enum):
     COMPLETED = "completed"
     RESCHEDULED = "rescheduled"
 
+# Statuses that hold a doctor's time slot
+ACTIVE_STATUSES = [AppointmentStatus.PENDING, AppointmentStatus.CONFIRMED, AppointmentStatus.RESCHEDULED]
+ACTIVE_STATUS_CLAUSE = text(
+    "status IN (%s)" % ", ".join(f"'{status.value}'" for status in ACTIVE_STATUSES)
+)
+
 class Appointment(Base):
     __tablename__ = "appointments"
+    __table_args__ = (
+        # check_availability and doctor listings: equality on doctor, range on time
+        Index("ix_appointments_doctor_datetime_status", "doctor_id", "appointment_datetime", "status"),
+        Index("ix_appointments_patient_datetime", "patient_id", "appointment_datetime"),
+        # One active appointment per doctor and slot, enforced by the database so
+        # concurrent bookings cannot both succeed
+        Index(
+            "uq_appointments_doctor_slot_active", "doctor_id", "slot_start",
+            unique=True,
+            sqlite_where=ACTIVE_STATUS_CLAUSE,
+            postgresql_where=ACTIVE_STATUS_CLAUSE
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     doctor_id = Column(Integer, ForeignKey("doctors.id"))
     patient_id = Column(Integer, ForeignKey("patients.id"))
     appointment_datetime = Column(DateTime, nullable=False)
+    # appointment_datetime floored to the slot grid, kept in sync by the events below
+    slot_start = Column(DateTime, nullable=False)
     status = Column(String, default=AppointmentStatus.PENDING)
     reason = Column(Text)
     notes = Column(Text)
+    version = Column(Integer, nullable=False, server_default="1")
     
     doctor = relationship("Doctor", back_populates="appointments")
-    patient = relationship("Patient", back_populates="appointments")
\ No newline at end of file
+    patient = relationship("Patient", back_populates="appointments")
+    
+    __mapper_args__ = {"version_id_col": version}
+
+@event.listens_for(Appointment, "before_insert")
+@event.listens_for(Appointment, "before_update")
+def _set_slot_start(mapper, connection, target):
+    target.slot_start = slot_start(target.appointment_datetime)
\ No newline at end of file
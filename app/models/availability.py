@@ -1,9 +1,14 @@
-from sqlalchemy import Column, Integer, ForeignKey, String, Time, Boolean
+from sqlalchemy import Column, Integer, ForeignKey, String, Time, Boolean, Index, event, update
 from sqlalchemy.orm import relationship
 from app.database import Base
+from app.models.doctor import Doctor
 
 class Availability(Base):
     __tablename__ = "availabilities"
+    __table_args__ = (
+        # A doctor's active availabilities, read to build their slot bitmaps
+        Index("ix_availabilities_doctor_active", "doctor_id", "is_active"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     doctor_id = Column(Integer, ForeignKey("doctors.id"))
@@ -11,5 +16,21 @@ class Availability(Base):
     start_time = Column(Time, nullable=False)
     end_time = Column(Time, nullable=False)
     is_active = Column(Boolean, default=True)
+    version = Column(Integer, nullable=False, server_default="1")
     
-    doctor = relationship("Doctor", back_populates="availabilities")
\ No newline at end of file
+    doctor = relationship("Doctor", back_populates="availabilities")
+    
+    __mapper_args__ = {"version_id_col": version}
+
+@event.listens_for(Availability, "after_insert")
+@event.listens_for(Availability, "after_update")
+@event.listens_for(Availability, "after_delete")
+def _bump_schedule_version(mapper, connection, target):
+    # In the same transaction as the write, so every worker's next booking
+    # check sees that its cached schedule of this doctor is out of date
+    doctors = Doctor.__table__
+    connection.execute(
+        update(doctors)
+        .where(doctors.c.id == target.doctor_id)
+        .values(schedule_version=doctors.c.schedule_version + 1)
+    )
\ No newline at end of file
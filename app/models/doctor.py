@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text, Date, ForeignKey, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, Date, ForeignKey, Boolean, Index, event
+from sqlalchemy.orm import Session, relationship
 from app.database import Base
 
 class WorkExperience(Base):
@@ -30,6 +30,12 @@ class AcademicHistory(Base):
 
 class Doctor(Base):
     __tablename__ = "doctors"
+    __table_args__ = (
+        # Directory filters, ordered by id for keyset pagination
+        Index("ix_doctors_specialization_id", "specialization", "id"),
+        Index("ix_doctors_is_active_id", "is_active", "id"),
+        Index("uq_doctors_calendar_token", "calendar_token", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String(100), unique=True, index=True, nullable=False)
@@ -38,8 +44,32 @@ class Doctor(Base):
     specialization = Column(String(100), nullable=False)
     phone_number = Column(String(20))
     is_active = Column(Boolean, default=True)
+    # Secret path segment of the doctor's iCalendar feed, set on first request
+    calendar_token = Column(String(64))
+    # Row version, bumped on every update including changes to the profile's experience/history
+    version = Column(Integer, nullable=False, server_default="1")
+    # Bumped on every write to the doctor's availabilities (see app.models.availability),
+    # so a cached weekly schedule can be checked against the database with one row read
+    schedule_version = Column(Integer, nullable=False, server_default="0")
     
     work_experiences = relationship("WorkExperience", back_populates="doctor", cascade="all, delete-orphan")
     academic_histories = relationship("AcademicHistory", back_populates="doctor", cascade="all, delete-orphan")
     availabilities = relationship("Availability", back_populates="doctor", cascade="all, delete-orphan")
-    appointments = relationship("Appointment", back_populates="doctor", cascade="all, delete-orphan")
\ No newline at end of file
+    appointments = relationship("Appointment", back_populates="doctor", cascade="all, delete-orphan")
+    
+    __mapper_args__ = {"version_id_col": version}
+
+@event.listens_for(Session, "before_flush")
+def _bump_profile_version(session, flush_context, instances):
+    # Work experience and academic history are part of the doctor's profile, so
+    # writing them must move the doctor's version (and its ETag) too
+    doctors = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if not isinstance(obj, (WorkExperience, AcademicHistory)) or obj.doctor_id is None:
+            continue
+        doctor = session.get(Doctor, obj.doctor_id)
+        if doctor is not None and doctor not in session.deleted and doctor not in session.new:
+            doctors.add(doctor)
+    for doctor in doctors:
+        # An explicit version is written as given, still guarded by the loaded one
+        doctor.version += 1
\ No newline at end of file
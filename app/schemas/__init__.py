@@ -4,5 +4,8 @@ from app.schemas.doctor import (
     AcademicHistoryCreate, AcademicHistoryInDB
 )
 from app.schemas.patient import Patient, PatientCreate, PatientUpdate
-from app.schemas.availability import Availability, AvailabilityCreate, AvailabilityUpdate
-from app.schemas.appointment import Appointment, AppointmentCreate, AppointmentUpdate, AppointmentReschedule
\ No newline at end of file
+from app.schemas.availability import Availability, AvailabilityCreate, AvailabilityUpdate, AvailableSlot
+from app.schemas.appointment import (
+    Appointment, AppointmentCreate, AppointmentUpdate, AppointmentReschedule,
+    AppointmentBatchCreate, AppointmentBatchItemResult, AppointmentBatchResult
+)
\ No newline at end of file
@@ -1,7 +1,17 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field, validator
+from typing import List, Optional
 from datetime import datetime
 from app.models.appointment import AppointmentStatus
+from app.core.slots import SLOT_MINUTES, local_naive
+
+def validate_booking_time(v: datetime) -> datetime:
+    # Rows store naive local times, so aware input is converted here once for
+    # every booking path. Bookings hold exactly one grid slot, so a time
+    # between grid lines (09:10) would overlap the next slot (09:30)
+    v = local_naive(v)
+    if v.minute % SLOT_MINUTES or v.second or v.microsecond:
+        raise ValueError(f"appointment_datetime must start on a {SLOT_MINUTES}-minute slot boundary")
+    return v
 
 class AppointmentBase(BaseModel):
     appointment_datetime: datetime
@@ -11,6 +21,8 @@ class AppointmentBase(BaseModel):
 class AppointmentCreate(AppointmentBase):
     doctor_id: int
     
+    _booking_time = validator('appointment_datetime', allow_reuse=True)(validate_booking_time)
+    
     class Config:
         json_schema_extra = {
             "example": {
@@ -24,6 +36,8 @@ class AppointmentCreate(AppointmentBase):
 class AppointmentReschedule(BaseModel):
     appointment_datetime: datetime
     
+    _booking_time = validator('appointment_datetime', allow_reuse=True)(validate_booking_time)
+    
     class Config:
         json_schema_extra = {
             "example": {
@@ -52,4 +66,20 @@ class Appointment(AppointmentBase):
     status: AppointmentStatus
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+MAX_BATCH_SIZE = 500
+
+class AppointmentBatchCreate(BaseModel):
+    appointments: List[AppointmentCreate] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+class AppointmentBatchItemResult(BaseModel):
+    index: int
+    success: bool
+    appointment: Optional[Appointment] = None
+    error: Optional[str] = None
+
+class AppointmentBatchResult(BaseModel):
+    created: int
+    failed: int
+    results: List[AppointmentBatchItemResult]
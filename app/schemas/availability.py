@@ -1,6 +1,6 @@
 from pydantic import BaseModel, validator
 from typing import Optional
-from datetime import time
+from datetime import datetime, time
 import re
 
 class AvailabilityBase(BaseModel):
@@ -53,4 +53,13 @@ class Availability(AvailabilityBase):
     is_active: bool
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class AvailableSlot(BaseModel):
+    start: datetime
+    end: datetime
+
+class DoctorSlot(AvailableSlot):
+    doctor_id: int
+    full_name: str
+    specialization: str
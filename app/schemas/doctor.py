@@ -108,4 +108,8 @@ class Doctor(DoctorBase):
     academic_histories: List[AcademicHistoryInDB] = []
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class CalendarLink(BaseModel):
+    # Subscription URL of the doctor's iCalendar feed; anyone holding it can read the feed
+    url: str
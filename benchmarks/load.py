@@ -0,0 +1,343 @@
+"""End-to-end HTTP load benchmark against the ASGI app, in-process.
+
+Seeds a temporary database with N doctors (weekday availabilities, experience
+and history), M patients and K appointments, then runs a weighted mix of
+login, directory, availability, booking, cancel and reschedule requests
+through `app.main:app` from `--concurrency` concurrent clients. Prints JSON
+with throughput, status counts and p50/p95/p99 latency per route.
+
+Usage:
+    python -m benchmarks.load --duration 30 --concurrency 32
+    python -m benchmarks.load --doctors 500 --patients 5000 --appointments 50000 --output baseline.json
+    python -m benchmarks.load --mix availability=10,book=1
+    ASYNC_DB_ENABLED=true python -m benchmarks.load
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time as timer
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "load.db")
+
+import httpx
+
+from app.config import settings
+from app.database import SessionLocal, engine
+from app.main import app
+from app.models import Doctor, WorkExperience, AcademicHistory, Patient, Availability, Appointment
+from app.models.appointment import AppointmentStatus
+from app.core.security import get_password_hash
+from app.core.schema import create_schema
+from app.core.slots import SLOT_DURATION
+
+PASSWORD = "load-benchmark"
+SPECIALIZATIONS = ["Cardiology", "Dermatology", "Neurology", "Pediatrics", "General Practice"]
+BOOKING_DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+DAY_START, DAY_END = time(9), time(17)
+SLOTS_PER_DAY = int((DAY_END.hour - DAY_START.hour) * 60 / 30)
+BOOKING_HORIZON_DAYS = 90
+TOKEN_POOL = 20
+
+# Relative weight of each operation in the default mix
+DEFAULT_MIX = {
+    "login": 1,
+    "directory": 10,
+    "doctor": 10,
+    "availability": 25,
+    "slots": 10,
+    "patient_appointments": 10,
+    "book": 5,
+    "cancel": 2,
+    "reschedule": 2,
+}
+
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"unknown operation {name!r}, expected one of {sorted(DEFAULT_MIX)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def future_slot(rng):
+    # A random weekday slot inside the seeded 09:00-17:00 availability
+    while True:
+        day = date.today() + timedelta(days=rng.randint(1, BOOKING_HORIZON_DAYS))
+        if day.weekday() < len(BOOKING_DAYS):
+            return datetime.combine(day, DAY_START) + SLOT_DURATION * rng.randrange(SLOTS_PER_DAY)
+
+
+def seed(args, rng):
+    # A fresh database gets its tables here; the app only checks the revision
+    create_schema(engine)
+    hashed = get_password_hash(PASSWORD)
+    with SessionLocal() as db:
+        doctors = []
+        for i in range(args.doctors):
+            doctor = Doctor(
+                email=f"load-doctor{i}@example.com", hashed_password=hashed,
+                full_name=f"Doctor {i}", specialization=SPECIALIZATIONS[i % len(SPECIALIZATIONS)]
+            )
+            doctor.work_experiences = [
+                WorkExperience(hospital_name=f"Hospital {i % 37}", position="Physician", start_date=date(2015, 1, 1))
+            ]
+            doctor.academic_histories = [
+                AcademicHistory(
+                    institution=f"University {i % 23}", degree="MD", field_of_study="Medicine",
+                    start_date=date(2008, 9, 1)
+                )
+            ]
+            doctor.availabilities = [
+                Availability(day_of_week=day, start_time=DAY_START, end_time=DAY_END, is_active=True)
+                for day in BOOKING_DAYS
+            ]
+            doctors.append(doctor)
+        patients = [
+            Patient(email=f"load-patient{i}@example.com", hashed_password=hashed, full_name=f"Patient {i}")
+            for i in range(args.patients)
+        ]
+        db.add_all(doctors + patients)
+        db.flush()
+
+        # One active appointment per doctor slot, as the slot index requires
+        taken = set()
+        statuses = [AppointmentStatus.PENDING, AppointmentStatus.CONFIRMED]
+        appointments = []
+        while len(appointments) < min(args.appointments, args.doctors * SLOTS_PER_DAY * 60):
+            doctor = rng.choice(doctors)
+            when = future_slot(rng)
+            if (doctor.id, when) in taken:
+                continue
+            taken.add((doctor.id, when))
+            appointments.append(Appointment(
+                doctor_id=doctor.id, patient_id=rng.choice(patients).id,
+                appointment_datetime=when, status=rng.choice(statuses)
+            ))
+        db.add_all(appointments)
+        db.commit()
+        return [doctor.id for doctor in doctors], [patient.id for patient in patients]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def record(self, route, status_code, seconds):
+        self.latencies[route].append(seconds * 1000)
+        self.statuses[route][status_code] += 1
+
+    @staticmethod
+    def _percentile(ordered, fraction):
+        return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+    def summary(self, latencies, statuses, elapsed):
+        ordered = sorted(latencies)
+        return {
+            "requests": len(ordered),
+            "throughput_rps": round(len(ordered) / elapsed, 2),
+            "statuses": {str(code): count for code, count in sorted(statuses.items())},
+            "mean_ms": round(statistics.fmean(ordered), 3),
+            "p50_ms": round(self._percentile(ordered, 0.50), 3),
+            "p95_ms": round(self._percentile(ordered, 0.95), 3),
+            "p99_ms": round(self._percentile(ordered, 0.99), 3),
+            "max_ms": round(ordered[-1], 3),
+        }
+
+    def report(self, elapsed):
+        combined_statuses = defaultdict(int)
+        for statuses in self.statuses.values():
+            for code, count in statuses.items():
+                combined_statuses[code] += count
+        every = [value for values in self.latencies.values() for value in values]
+        return {
+            "elapsed_seconds": round(elapsed, 3),
+            "total": self.summary(every, combined_statuses, elapsed) if every else {},
+            "routes": {
+                route: self.summary(self.latencies[route], self.statuses[route], elapsed)
+                for route in sorted(self.latencies)
+            },
+        }
+
+
+class LoadRun:
+    def __init__(self, client, recorder, doctor_ids, doctor_tokens, patient_tokens, rng):
+        self.client = client
+        self.recorder = recorder
+        self.doctor_ids = doctor_ids
+        self.doctor_tokens = doctor_tokens
+        self.patient_tokens = patient_tokens
+        self.rng = rng
+        # Appointments booked during the run: (appointment id, doctor index, patient index)
+        self.booked = []
+
+    async def request(self, route, method, path, **kwargs):
+        started = timer.perf_counter()
+        response = await self.client.request(method, settings.API_V1_STR + path, **kwargs)
+        self.recorder.record(route, response.status_code, timer.perf_counter() - started)
+        return response
+
+    async def login(self):
+        if self.rng.random() < 0.5:
+            email = f"load-patient{self.rng.randrange(len(self.patient_tokens))}@example.com"
+        else:
+            email = f"load-doctor{self.rng.randrange(len(self.doctor_tokens))}@example.com"
+        await self.request("POST /auth/login", "POST", "/auth/login", data={"username": email, "password": PASSWORD})
+
+    async def directory(self):
+        params = {"limit": 20}
+        if self.rng.random() < 0.5:
+            params["specialization"] = self.rng.choice(SPECIALIZATIONS)
+        await self.request("GET /doctors/", "GET", "/doctors/", params=params)
+
+    async def doctor(self):
+        await self.request("GET /doctors/{doctor_id}", "GET", f"/doctors/{self.rng.choice(self.doctor_ids)}")
+
+    async def availability(self):
+        doctor_id = self.rng.choice(self.doctor_ids)
+        await self.request("GET /availabilities/doctor/{doctor_id}", "GET", f"/availabilities/doctor/{doctor_id}")
+
+    async def slots(self):
+        start = date.today() + timedelta(days=self.rng.randint(1, BOOKING_HORIZON_DAYS - 7))
+        await self.request(
+            "GET /availabilities/doctor/{doctor_id}/slots", "GET",
+            f"/availabilities/doctor/{self.rng.choice(self.doctor_ids)}/slots",
+            params={"start_date": start.isoformat(), "end_date": (start + timedelta(days=6)).isoformat()}
+        )
+
+    async def patient_appointments(self):
+        await self.request(
+            "GET /appointments/patient", "GET", "/appointments/patient",
+            headers=self.rng.choice(self.patient_tokens)
+        )
+
+    async def book(self):
+        doctor = self.rng.randrange(len(self.doctor_tokens))
+        patient = self.rng.randrange(len(self.patient_tokens))
+        response = await self.request(
+            "POST /appointments/", "POST", "/appointments/", headers=self.patient_tokens[patient],
+            json={"doctor_id": self.doctor_ids[doctor], "appointment_datetime": future_slot(self.rng).isoformat()}
+        )
+        if response.status_code == 201:
+            self.booked.append((response.json()["id"], doctor, patient))
+
+    async def cancel(self):
+        if not self.booked:
+            return await self.book()
+        appointment_id, doctor, _ = self.booked.pop(self.rng.randrange(len(self.booked)))
+        await self.request(
+            "PUT /appointments/{appointment_id}/cancel", "PUT", f"/appointments/{appointment_id}/cancel",
+            headers=self.doctor_tokens[doctor]
+        )
+
+    async def reschedule(self):
+        if not self.booked:
+            return await self.book()
+        appointment_id, _, patient = self.rng.choice(self.booked)
+        await self.request(
+            "PUT /appointments/{appointment_id}/reschedule", "PUT", f"/appointments/{appointment_id}/reschedule",
+            headers=self.patient_tokens[patient],
+            json={"appointment_datetime": future_slot(self.rng).isoformat()}
+        )
+
+    async def worker(self, operations, weights, deadline, budget):
+        while timer.perf_counter() < deadline and budget["remaining"] > 0:
+            budget["remaining"] -= 1
+            await getattr(self, self.rng.choices(operations, weights)[0])()
+
+
+async def login_pool(client, kind, count):
+    tokens = []
+    for i in range(count):
+        response = await client.post(
+            settings.API_V1_STR + "/auth/login",
+            data={"username": f"load-{kind}{i}@example.com", "password": PASSWORD}
+        )
+        response.raise_for_status()
+        tokens.append({"Authorization": f"Bearer {response.json()['access_token']}"})
+    return tokens
+
+
+async def run(args, doctor_ids):
+    rng = random.Random(args.seed)
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://load.local", timeout=None) as client:
+            doctor_tokens = await login_pool(client, "doctor", min(TOKEN_POOL, args.doctors))
+            patient_tokens = await login_pool(client, "patient", min(TOKEN_POOL, args.patients))
+
+            operations = list(args.mix)
+            weights = [args.mix[name] for name in operations]
+            if args.warmup:
+                warmup = LoadRun(client, Recorder(), doctor_ids, doctor_tokens, patient_tokens, rng)
+                await asyncio.gather(*[
+                    warmup.worker(operations, weights, timer.perf_counter() + args.warmup, {"remaining": sys.maxsize})
+                    for _ in range(args.concurrency)
+                ])
+
+            recorder = Recorder()
+            load = LoadRun(client, recorder, doctor_ids, doctor_tokens, patient_tokens, rng)
+            budget = {"remaining": args.requests or sys.maxsize}
+            started = timer.perf_counter()
+            await asyncio.gather(*[
+                load.worker(operations, weights, started + args.duration, budget)
+                for _ in range(args.concurrency)
+            ])
+            return recorder.report(timer.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--doctors", type=int, default=100)
+    parser.add_argument("--patients", type=int, default=1000)
+    parser.add_argument("--appointments", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run after warm-up")
+    parser.add_argument("--requests", type=int, default=0, help="Stop after this many requests (0 = no limit)")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Seconds of unrecorded warm-up traffic")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="e.g. availability=25,book=5")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    seeding_started = timer.perf_counter()
+    doctor_ids, _ = seed(args, random.Random(args.seed))
+    seed_seconds = timer.perf_counter() - seeding_started
+
+    report = asyncio.run(run(args, doctor_ids))
+    report = {
+        "config": {
+            "database": settings.DATABASE_URL.split("://")[0],
+            "async_db": settings.ASYNC_DB_ENABLED,
+            "doctors": args.doctors,
+            "patients": args.patients,
+            "appointments": args.appointments,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "mix": args.mix,
+            "seed": args.seed,
+            "seed_seconds": round(seed_seconds, 3),
+        },
+        **report,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
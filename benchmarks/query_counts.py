@@ -0,0 +1,176 @@
+"""Assert the number of SQL statements issued per endpoint.
+
+Seeds a temporary database, calls each endpoint through the ASGI app and
+fails (exit code 1) when an endpoint issues more statements than its budget,
+which catches N+1 regressions such as lazy-loaded relationships in list
+responses. Each endpoint is measured twice: cold, with every in-process cache
+(principals, availability lists, slot bitmaps, calendar feeds) cleared, and
+then warm, right after the cold call. Both counts have their own budget, so
+the cached endpoints' cold path is still guarded.
+
+Usage:
+    python -m benchmarks.query_counts [--doctors 100]
+    ASYNC_DB_ENABLED=true python -m benchmarks.query_counts
+"""
+import argparse
+import os
+import sys
+import tempfile
+from datetime import date, datetime, time, timedelta
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "query_counts.db")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.config import settings
+from app.database import SessionLocal, engine, async_engine
+from app.main import app
+from app.models import Doctor, WorkExperience, AcademicHistory, Patient, Availability, Appointment
+from app.core.security import get_password_hash
+from app.core.schema import create_schema
+from app.core.auth_cache import token_cache, principal_cache
+from app.core.availability_cache import availability_cache
+from app.core.schedule import schedule_cache, occupancy_cache
+from app.core.calendar import calendar_cache, calendar_token_cache
+
+PASSWORD = "query-counts"
+
+# Maximum statements per request as (cold, warm), independent of how many rows
+# are returned
+BUDGETS = {
+    "GET /doctors/": (3, 3),
+    "GET /doctors/{doctor_id}": (3, 3),
+    "GET /doctors/me": (4, 3),
+    # Doctor lookup and the availability list, which is then cached
+    "GET /availabilities/doctor/{doctor_id}": (2, 0),
+    "GET /availabilities/doctor/{doctor_id}/slots": (3, 1),
+    # Doctors, their schedules, and bookings for each week searched (two by default)
+    "GET /doctors/earliest-available": (4, 1),
+    "GET /appointments/doctor": (2, 1),
+    "GET /appointments/patient": (2, 1),
+    # Token lookup, doctor name and upcoming appointments
+    "GET /calendar/{token}.ics": (3, 0),
+}
+
+CACHES = (
+    token_cache, principal_cache, availability_cache, schedule_cache, occupancy_cache,
+    calendar_cache, calendar_token_cache,
+)
+
+
+class StatementCounter:
+    def __init__(self, target):
+        self.target = target
+        self.statements = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        self.statements = []
+        event.listen(self.target, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.target, "before_cursor_execute", self._record)
+
+
+def seed(doctors):
+    # A fresh database gets its tables here; the app only checks the revision
+    create_schema(engine)
+    hashed = get_password_hash(PASSWORD)
+    start = datetime.combine(date.today() + timedelta(days=1), time(9))
+    with SessionLocal() as db:
+        for i in range(doctors):
+            doctor = Doctor(
+                email=f"qc-doctor{i}@example.com", hashed_password=hashed,
+                full_name=f"Doctor {i}", specialization="General"
+            )
+            doctor.work_experiences = [
+                WorkExperience(hospital_name=f"Hospital {j}", position="Physician", start_date=date(2015, 1, 1))
+                for j in range(2)
+            ]
+            doctor.academic_histories = [
+                AcademicHistory(
+                    institution=f"University {j}", degree="MD", field_of_study="Medicine",
+                    start_date=date(2008, 9, 1)
+                )
+                for j in range(2)
+            ]
+            doctor.availabilities = [
+                Availability(day_of_week=day, start_time=time(9), end_time=time(17), is_active=True)
+                for day in ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday")
+            ]
+            db.add(doctor)
+        patient = Patient(email="qc-patient@example.com", hashed_password=hashed, full_name="Patient")
+        db.add(patient)
+        db.flush()
+        first_doctor = db.query(Doctor).order_by(Doctor.id).first()
+        for i in range(20):
+            db.add(Appointment(
+                doctor_id=first_doctor.id, patient_id=patient.id,
+                appointment_datetime=start + timedelta(days=i), status="pending"
+            ))
+        db.commit()
+        return first_doctor.id
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--doctors", type=int, default=100)
+    args = parser.parse_args()
+
+    client = TestClient(app)
+    doctor_id = seed(args.doctors)
+    prefix = settings.API_V1_STR
+
+    def token(email):
+        response = client.post(f"{prefix}/auth/login", data={"username": email, "password": PASSWORD})
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    doctor_headers = token("qc-doctor0@example.com")
+    patient_headers = token("qc-patient@example.com")
+    calendar_path = client.get(f"{prefix}/doctors/me/calendar", headers=doctor_headers).json()["url"].split(prefix, 1)[1]
+    today = date.today()
+    cases = [
+        ("GET /doctors/", f"/doctors/?limit={min(args.doctors, 500)}", None),
+        ("GET /doctors/{doctor_id}", f"/doctors/{doctor_id}", None),
+        ("GET /doctors/me", "/doctors/me", doctor_headers),
+        ("GET /availabilities/doctor/{doctor_id}", f"/availabilities/doctor/{doctor_id}", None),
+        (
+            "GET /availabilities/doctor/{doctor_id}/slots",
+            f"/availabilities/doctor/{doctor_id}/slots?start_date={today}&end_date={today + timedelta(days=13)}",
+            None,
+        ),
+        ("GET /doctors/earliest-available", "/doctors/earliest-available?specialization=General&limit=20", None),
+        ("GET /appointments/doctor", "/appointments/doctor", doctor_headers),
+        ("GET /appointments/patient", "/appointments/patient", patient_headers),
+        ("GET /calendar/{token}.ics", calendar_path, None),
+    ]
+
+    counter = StatementCounter(async_engine.sync_engine if settings.ASYNC_DB_ENABLED else engine)
+    failures = 0
+    for name, path, headers in cases:
+        for cache in CACHES:
+            cache.clear()
+        for phase, budget in zip(("cold", "warm"), BUDGETS[name]):
+            with counter:
+                response = client.get(prefix + path, headers=headers)
+            count = len(counter.statements)
+            ok = response.status_code == 200 and count <= budget
+            failures += not ok
+            print(
+                f"{'ok  ' if ok else 'FAIL'} {name:<48} {phase} {count:>3} statements "
+                f"(budget {budget}, HTTP {response.status_code})"
+            )
+            if not ok:
+                for statement in counter.statements:
+                    print("       " + " ".join(statement.split())[:160])
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
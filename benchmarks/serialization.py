@@ -0,0 +1,174 @@
+"""Compare the two ways a list endpoint can turn database rows into JSON.
+
+"orm" is the response_model path: load ORM objects (with selectinload for the
+doctor profile), validate them into the response schema and encode the result
+with FastAPI's JSONResponse. "rows" is the fast path the list endpoints use:
+select plain column tuples, build schema-shaped dicts and encode them with
+app.core.fast_json. "rows-stdlib" is the fast path with the json module
+encoder, i.e. what runs when orjson is not installed.
+
+Each case reports the median time to load and to serialize one page, and
+checks that all three produce the same JSON.
+
+Usage:
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization --doctors 100 --appointments 500 --repeat 50
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time as timer
+from datetime import date, datetime, timedelta
+from typing import List
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from app.core import fast_json
+from app.core.schema import create_schema
+from app.models import Doctor, Patient, Appointment
+from app.models.appointment import AppointmentStatus
+from app.models.doctor import WorkExperience, AcademicHistory
+from app.schemas.appointment import Appointment as AppointmentSchema
+from app.schemas.doctor import Doctor as DoctorSchema
+from app.api.endpoints.doctors import DOCTOR_COLUMNS, DOCTOR_PROFILE_OPTIONS, load_doctor_profiles
+from app.api.endpoints.appointments import APPOINTMENT_COLUMNS, APPOINTMENT_ORDER
+
+
+def seed(engine, doctors, appointments):
+    create_schema(engine)
+    start = datetime(2030, 1, 1, 9)
+    with engine.begin() as conn:
+        conn.execute(insert(Doctor.__table__), [
+            {"id": i, "email": f"doctor{i}@example.com", "hashed_password": "x",
+             "full_name": f"Doctor {i}", "specialization": "General", "phone_number": "555-0100",
+             "is_active": True}
+            for i in range(1, doctors + 1)
+        ])
+        conn.execute(insert(Patient.__table__), [
+            {"id": 1, "email": "patient1@example.com", "hashed_password": "x",
+             "full_name": "Patient 1", "is_active": True}
+        ])
+        # A typical profile: a few jobs and degrees per doctor
+        conn.execute(insert(WorkExperience.__table__), [
+            {"doctor_id": i, "hospital_name": f"Hospital {j}", "position": "Consultant",
+             "start_date": date(2010 + j, 1, 1), "end_date": date(2012 + j, 1, 1),
+             "description": "General practice and emergency cover"}
+            for i in range(1, doctors + 1)
+            for j in range(random.randint(1, 4))
+        ])
+        conn.execute(insert(AcademicHistory.__table__), [
+            {"doctor_id": i, "institution": f"University {j}", "degree": "MD",
+             "field_of_study": "Medicine", "start_date": date(2000 + j, 9, 1), "end_date": date(2006 + j, 6, 30)}
+            for i in range(1, doctors + 1)
+            for j in range(random.randint(1, 3))
+        ])
+        conn.execute(insert(Appointment.__table__), [
+            {"doctor_id": 1, "patient_id": 1,
+             "appointment_datetime": start + timedelta(minutes=30 * i),
+             "slot_start": start + timedelta(minutes=30 * i),
+             "status": AppointmentStatus.CONFIRMED.value, "reason": "Follow-up", "notes": None}
+            for i in range(appointments)
+        ])
+
+
+def orm_doctors(db: Session, limit: int):
+    return db.query(Doctor).options(*DOCTOR_PROFILE_OPTIONS).order_by(Doctor.id).limit(limit).all()
+
+
+def row_doctors(db: Session, limit: int):
+    return load_doctor_profiles(db, db.execute(select(*DOCTOR_COLUMNS).order_by(Doctor.id).limit(limit)).all())
+
+
+def orm_appointments(db: Session, limit: int):
+    return db.query(Appointment).filter(Appointment.doctor_id == 1).order_by(*APPOINTMENT_ORDER).limit(limit).all()
+
+
+def row_appointments(db: Session, limit: int):
+    rows = db.execute(
+        select(*APPOINTMENT_COLUMNS).where(Appointment.doctor_id == 1).order_by(*APPOINTMENT_ORDER).limit(limit)
+    ).all()
+    return fast_json.rows_to_dicts(rows, APPOINTMENT_COLUMNS)
+
+
+def response_model_body(adapter: TypeAdapter):
+    # What FastAPI does with a returned list: validate, dump to JSON-able data, encode
+    return lambda objects: JSONResponse(adapter.dump_python(adapter.validate_python(objects), mode="json")).body
+
+
+def stdlib_dumps(content) -> bytes:
+    encoder, fast_json.orjson = fast_json.orjson, None
+    try:
+        return fast_json.dumps(content)
+    finally:
+        fast_json.orjson = encoder
+
+
+def measure(engine, load, encode, limit, repeat):
+    load_times, encode_times = [], []
+    for _ in range(repeat):
+        # A fresh session per page, as each request gets
+        with Session(engine) as db:
+            started = timer.perf_counter()
+            content = load(db, limit)
+            loaded = timer.perf_counter()
+            body = encode(content)
+            load_times.append(loaded - started)
+            encode_times.append(timer.perf_counter() - loaded)
+    load_ms = statistics.median(load_times) * 1000
+    encode_ms = statistics.median(encode_times) * 1000
+    return body, {
+        "load_ms": round(load_ms, 3),
+        "serialize_ms": round(encode_ms, 3),
+        "total_ms": round(load_ms + encode_ms, 3),
+        "bytes": len(body),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--doctors", type=int, default=100, help="Doctors per directory page")
+    parser.add_argument("--appointments", type=int, default=500, help="Appointments per list page")
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    engine = create_engine("sqlite:///" + os.path.join(tempfile.mkdtemp(), "serialization.db"))
+    seed(engine, args.doctors, args.appointments)
+
+    endpoints = {
+        "doctors": (args.doctors, orm_doctors, row_doctors, TypeAdapter(List[DoctorSchema])),
+        "appointments": (args.appointments, orm_appointments, row_appointments, TypeAdapter(List[AppointmentSchema])),
+    }
+    report = {"config": {key: value for key, value in vars(args).items() if key != "output"}, "endpoints": {}}
+    for name, (limit, orm_load, row_load, adapter) in endpoints.items():
+        cases = {
+            "orm": (orm_load, response_model_body(adapter)),
+            "rows": (row_load, fast_json.dumps),
+            "rows-stdlib": (row_load, stdlib_dumps),
+        }
+        results, bodies = {}, {}
+        for case, (load, encode) in cases.items():
+            bodies[case], results[case] = measure(engine, load, encode, limit, args.repeat)
+            print(f"{name:<13} {case:<12} {json.dumps(results[case])}")
+        if len({json.dumps(json.loads(body)) for body in bodies.values()}) != 1:
+            raise SystemExit(f"{name}: the serialization paths produced different JSON")
+        results["speedup"] = round(results["orm"]["total_ms"] / results["rows"]["total_ms"], 2)
+        print(f"{name:<13} rows is {results['speedup']}x faster than orm")
+        report["endpoints"][name] = results
+
+    engine.dispose()
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()